@@ -1,24 +1,120 @@
 from abc import ABC, abstractmethod
 import pandas as pd
+import re
 from memory.semantic_memory import SemanticMemory
+from llm.cache import ReplayCacheMiss
+from llm.client import LLMClient
+from agents.vote_gate import VoteGate
 
 class BaseAgent(ABC):
     """
     Abstract base class for all trading agents.
     """
-    def __init__(self, name: str, config: dict, semantic_memory: SemanticMemory):
+    LAYER = None  # The memory layer the agent reads; its latest row is what the vote gate compares
+    USES_SEMANTIC_MEMORY = False
+    def __init__(self, name: str, config: dict, semantic_memory: SemanticMemory, llm: LLMClient = None):
         """
         Initializes the agent.
         
         :param name: The name of the agent (e.g., "Short-Term Agent").
-        :param config: A configuration dictionary.
+        :param config: A configuration dictionary. `max_prompt_tokens` caps the size of the
+                       agent's prompts; data rows are dropped (oldest first) to fit. `gate`
+                       configures a VoteGate that reuses votes while the inputs barely move.
         :param semantic_memory: An instance of SemanticMemory for searching textual data.
+        :param llm: The LLMClient shared by all agents. A private default client is created if None.
         """
         self.name = name
         self.config = config
         self.semantic_memory = semantic_memory
+        self.llm = llm if llm is not None else LLMClient()
+        self.model = self.llm.model(config.get('model'))
+        self.max_prompt_tokens = config.get('max_prompt_tokens')
+        self.gate = VoteGate.from_config(config.get('gate'))
+        self.ticket = None  # Set by the debate while the agent votes against a deadline (see `_finish_vote`)
+
+    def _parse_vote(self, text: str):
+        """Extracts (vote, confidence) from a 'VOTE: ..., CONFIDENCE: ...' answer, or None."""
+        vote_match = re.search(r"VOTE:\s*(BUY|SELL|HOLD)", text, re.IGNORECASE)
+        confidence_match = re.search(r"CONFIDENCE:\s*([0-9.]+)", text, re.IGNORECASE)
+        if vote_match and confidence_match:
+            return vote_match.group(1).upper(), float(confidence_match.group(1))
+        return None
+
+    def _ask_llm(self, prompt: str) -> tuple[str, float]:
+        """
+        Sends a prompt to the agent's model and parses the 'VOTE: ..., CONFIDENCE: ...' answer.
+        Falls back to ('HOLD', 0.5) on API or parsing errors; cache misses in replay mode propagate.
+        """
+        agent_type = type(self).__name__
+        if self._abandoned():
+            return 'HOLD', 0.5
+        try:
+            response = self._generate(prompt)
+            # Parse the Response 
+            parsed = self._parse_vote(response.text)
+
+            if parsed:
+                vote, confidence = parsed
+                print(f"{agent_type} LLM Vote: {vote}, Confidence: {confidence}")
+                return vote, confidence
+            else:
+                print(f"{agent_type}: Could not parse LLM response: {response.text}")
+                return 'HOLD', 0.5
+
+        except ReplayCacheMiss:
+            raise
+        except Exception as e:
+            print(f"An error occurred while calling the Gemini API: {e}")
+            return 'HOLD', 0.5
+
+    def _abandoned(self) -> bool:
+        """Whether the debate has stopped waiting for the current vote."""
+        return self.ticket is not None and self.ticket.abandoned
+
+    def _generate(self, prompt: str):
+        """Asks the model. Under a deadline the response is only cached when the vote finishes (see `_finish_vote`)."""
+        if self.ticket is None:
+            return self.model.generate_content(prompt)
+        response = self.model.generate_content(prompt, cache=False)
+        self.ticket.responses.append((prompt, response.text))
+        return response
+
+    def _finish_vote(self, gate_updates: list):
+        """
+        Caches the vote's LLM responses and stores `gate_updates` ((fingerprint, vote, confidence)
+        tuples) in the vote gate. If the debate already used the fallback vote instead, only the
+        responses are cached: they are still the model's real answers, but the gate must not
+        reuse a vote the debate never counted. Replays learn about the fallback from the debate's
+        decision journal, not from the response cache.
+        """
+        ticket = self.ticket
+        responses = [] if ticket is None else ticket.responses
+
+        def remember():
+            for prompt, text in responses:
+                self.llm.remember(self.model.model_name, prompt, text)
+
+        def commit():
+            remember()
+            for fingerprint, vote, confidence in gate_updates:
+                self.gate.store(fingerprint, vote, confidence)
+
+        if ticket is None:
+            commit()
+        elif not ticket.finish(commit):
+            remember()
 
     @abstractmethod
+    def build_prompt(self, memory_snapshot: dict):
+        """
+        Builds the LLM prompt for a memory snapshot.
+
+        :param memory_snapshot: A dictionary containing the 'short_term', 'mid_term',
+                                and 'long_term' memory DataFrames.
+        :return: The prompt, or None if there is not enough data to ask the model.
+        """
+        pass
+
     def vote(self, memory_snapshot: dict) -> tuple[str, float]:
         """
         Analyzes the given memory snapshot and returns a trading decision and confidence score.
@@ -27,13 +123,112 @@ class BaseAgent(ABC):
                                 and 'long_term' memory DataFrames.
         :return: A tuple containing the vote ('BUY', 'SELL', 'HOLD') and a confidence score (0.0 to 1.0).
         """
-        pass
+        fingerprint = self._fingerprint(memory_snapshot)
+        if fingerprint is not None:
+            reused = self.gate.lookup(fingerprint)
+            if reused is not None:
+                return reused
+
+        prompt = self.build_prompt(memory_snapshot)
+        if prompt is None:
+            self._finish_vote([])
+            return 'HOLD', 0.5
+        vote, confidence = self._ask_llm(prompt)
+        self._finish_vote([] if fingerprint is None else [(fingerprint, vote, confidence)])
+        return vote, confidence
+
+    def _fingerprint(self, memory_snapshot: dict):
+        """The vote gate's fingerprint of the agent's inputs, or None if there is no gate or data."""
+        if self.gate is None:
+            return None
+        frame = memory_snapshot.get(self.LAYER)
+        if frame is None or frame.empty:
+            return None
+        semantic_count = None
+        if self.USES_SEMANTIC_MEMORY:
+            semantic_count = self.semantic_memory.visible_count(frame['ticker'].iloc[-1], as_of=frame.index[-1])
+        return self.gate.fingerprint(frame, semantic_count)
+
+    def vote_batch(self, memory_snapshots: list) -> list:
+        """
+        Votes on several memory snapshots (e.g. every ticker at the same timestamp), packing up to
+        `batch_size` (agent config, default 1) prompts into each LLM request. Items whose answer
+        cannot be parsed out of a batched response are re-asked one at a time.
+
+        :param memory_snapshots: The memory snapshots to vote on.
+        :return: A list of (vote, confidence) tuples in the same order as `memory_snapshots`.
+        """
+        batch_size = self.config.get('batch_size', 1)
+        results = [('HOLD', 0.5)] * len(memory_snapshots)
+        fingerprints = [self._fingerprint(snapshot) for snapshot in memory_snapshots]
+        pending = []
+        for position, snapshot in enumerate(memory_snapshots):
+            if fingerprints[position] is not None:
+                reused = self.gate.lookup(fingerprints[position])
+                if reused is not None:
+                    results[position] = reused
+                    continue
+            prompt = self.build_prompt(snapshot)
+            if prompt is not None:
+                pending.append((position, prompt))
+
+        gate_updates = []
+        for start in range(0, len(pending), batch_size):
+            if self._abandoned():
+                break  # The debate has used the fallback votes; stop asking
+            batch = pending[start:start + batch_size]
+            answers = self._ask_llm_batch([prompt for _, prompt in batch]) if len(batch) > 1 else {}
+            for item, (position, prompt) in enumerate(batch):
+                results[position] = answers[item] if item in answers else self._ask_llm(prompt)
+                if fingerprints[position] is not None:
+                    gate_updates.append((fingerprints[position], *results[position]))
+        self._finish_vote(gate_updates)
+        return results
+
+    def _ask_llm_batch(self, prompts: list) -> dict:
+        """
+        Sends several prompts as one structured request.
+
+        :return: A dict mapping the position of each prompt to its parsed (vote, confidence).
+                 Prompts missing from the answer are left out so the caller can retry them.
+        """
+        request = (
+            f"You will receive {len(prompts)} independent requests, numbered ITEM 1 to ITEM {len(prompts)}. "
+            "Answer every request on its own line, formatted exactly as "
+            "'ITEM <number>: VOTE: [BUY/SELL/HOLD], CONFIDENCE: [0.0-1.0]', and nothing else.\n\n"
+        )
+        for number, prompt in enumerate(prompts, start=1):
+            request += f"### ITEM {number}\n{prompt}\n"
+
+        try:
+            response = self._generate(request)
+        except ReplayCacheMiss:
+            raise
+        except Exception as e:
+            print(f"An error occurred while calling the Gemini API with a batch of {len(prompts)}: {e}")
+            return {}
+
+        answers = {}
+        for line in response.text.splitlines():
+            item_match = re.match(r"\W*ITEM\s*(\d+)\W*(.*)", line.strip(), re.IGNORECASE)
+            if not item_match:
+                continue
+            item = int(item_match.group(1)) - 1
+            parsed = self._parse_vote(item_match.group(2))
+            if parsed and 0 <= item < len(prompts):
+                answers[item] = parsed
+        if len(answers) < len(prompts):
+            print(f"{type(self).__name__}: Parsed {len(answers)} of {len(prompts)} batched answers; asking the rest individually.")
+        return answers
 
 if __name__ == '__main__':
     # This is an abstract class and cannot be instantiated directly.
     # The following code is for demonstration purposes of how a subclass would work.
     
     class DummyAgent(BaseAgent):
+        def build_prompt(self, memory_snapshot: dict):
+            return None
+
         def vote(self, memory_snapshot: dict) -> tuple[str, float]:
             print(f"Agent '{self.name}' is voting...")
             
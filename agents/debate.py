@@ -1,26 +1,163 @@
 from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import threading
+import time
+import pandas as pd
 from agents.base_agent import BaseAgent
 
+class VoteTicket:
+    """
+    Tracks one vote cast against a deadline. The debate abandons the ticket when the deadline
+    passes and the agent finishes it when its vote is ready; whichever comes first wins, so a
+    late vote never updates the vote gate after the debate has used the fallback vote.
+    """
+    def __init__(self):
+        self.abandoned = False
+        self.finished = False
+        self.responses = []  # (prompt, response text) of the vote's LLM calls
+        self._lock = threading.Lock()
+
+    def abandon(self) -> bool:
+        """Gives up on the vote; False if it already finished."""
+        with self._lock:
+            if not self.finished:
+                self.abandoned = True
+            return self.abandoned
+
+    def finish(self, commit) -> bool:
+        """Runs `commit` and marks the vote finished, unless it was abandoned first."""
+        with self._lock:
+            if self.abandoned:
+                return False
+            commit()
+            self.finished = True
+            return True
+
 class Debate:
     """
     Orchestrates a debate among trading agents to reach a consensus.
     """
-    def __init__(self, agents: List[BaseAgent]):
+    FALLBACK_VOTE = ('HOLD', 0.5)
+
+    def __init__(self, agents: List[BaseAgent], concurrent: bool = True, vote_timeout: float = None, journal=None):
+        """
+        :param agents: The agents taking part in the debate.
+        :param concurrent: Collect the votes in parallel threads instead of one after another.
+        :param vote_timeout: Default deadline in seconds for each vote. An agent's own
+                             `vote_timeout` config entry overrides it; None waits indefinitely.
+        :param journal: Optional ResponseCache whose decision journal records which votes used
+                        the fallback, so a replay of the run uses it at the same steps.
+        """
         self.agents = agents
+        self.concurrent = concurrent
+        self.vote_timeout = vote_timeout
+        self.journal = journal
+        self._executors = []
+        self._tasks = []
+        if concurrent and agents:
+            # One thread per agent. An agent still running past its deadline is skipped, with its
+            # fallback vote, until it finishes, instead of queueing more calls behind it.
+            self._executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix='debate') for _ in agents]
+            self._tasks = [None] * len(agents)
 
-    def run(self, memory_snapshot: dict) -> Tuple[str, float, List[dict]]:
+    def run(self, memory_snapshot: dict, step: str = None) -> Tuple[str, float, List[dict]]:
         """
         Gathers votes from all agents and determines the final decision using confidence weighting.
+
+        :param step: Identifies the decision step (e.g. ticker and timestamp) in the decision journal.
+        """
+        results = self._collect(lambda agent, snapshot: agent.vote(snapshot), memory_snapshot, self.FALLBACK_VOTE, step)
+        return self._conclude(results)
+
+    def run_batch(self, memory_snapshots: List[dict], steps: List[str] = None) -> List[Tuple[str, float, List[dict]]]:
+        """
+        Runs one debate per memory snapshot, letting each agent vote on all snapshots at once so
+        it can batch its LLM requests (see `BaseAgent.vote_batch`).
+
+        :param steps: Identifies the decision step of each snapshot in the decision journal.
+        :return: One (decision, confidence, votes) tuple per snapshot, in the same order.
         """
+        fallback = [self.FALLBACK_VOTE] * len(memory_snapshots)
+        step = None if steps is None else ' | '.join(steps)
+        results = self._collect(lambda agent, snapshots: agent.vote_batch(snapshots), memory_snapshots, fallback, step)
+        # results[agent][snapshot] -> per-snapshot list of agent votes
+        return [self._conclude(snapshot_results) for snapshot_results in zip(*results)]
+
+    def _conclude(self, results) -> Tuple[str, float, List[dict]]:
         votes = []
-        for agent in self.agents:
-            decision, confidence = agent.vote(memory_snapshot)
+        for agent, (decision, confidence) in zip(self.agents, results):
             votes.append({'agent': agent.name, 'decision': decision, 'confidence': confidence})
 
         final_decision, final_confidence = self._resolve_votes_with_weighting(votes)
-        
+
         return final_decision, final_confidence, votes
 
+    @staticmethod
+    def _own_copy(snapshot):
+        """A copy of a memory snapshot (or list of snapshots) that no other thread reads."""
+        if isinstance(snapshot, list):
+            return [Debate._own_copy(item) for item in snapshot]
+        return {key: value.copy() if isinstance(value, pd.DataFrame) else value for key, value in snapshot.items()}
+
+    def _collect(self, ask, snapshot, fallback, step=None) -> list:
+        """
+        Calls `ask(agent, snapshot)` for every agent, concurrently if enabled. Agents that miss
+        their deadline, which starts when their call does, get `fallback` so a slow LLM call never
+        stalls the step. Their call is abandoned: it keeps its own copy of the snapshot, and its
+        answer is cached but not stored in the vote gate. Which agents got `fallback` at `step`
+        is written to the decision journal, and replays give them `fallback` without asking.
+        """
+        replayed = [self._replays_fallback(agent, step) for agent in self.agents]
+        if not self._executors:
+            return [fallback if skip else ask(agent, snapshot) for agent, skip in zip(self.agents, replayed)]
+
+        calls = []
+        for position, agent in enumerate(self.agents):
+            timeout = agent.config.get('vote_timeout', self.vote_timeout)
+            if replayed[position]:
+                calls.append((timeout, None, None, 'replayed'))
+                continue
+            previous = self._tasks[position]
+            if previous is not None and not previous.done():
+                calls.append((timeout, None, None, 'busy'))
+                continue
+            # The agent's executor is idle, so the call starts now and the deadline runs from here
+            agent.ticket = None if timeout is None else VoteTicket()
+            own = snapshot if timeout is None else self._own_copy(snapshot)
+            future = self._executors[position].submit(ask, agent, own)
+            self._tasks[position] = future
+            calls.append((timeout, future, time.monotonic(), None))
+
+        results = []
+        for agent, (timeout, future, started, skipped) in zip(self.agents, calls):
+            if skipped is not None:
+                if skipped == 'busy':
+                    print(f"{agent.name} is still busy with a late vote. Using fallback vote {self.FALLBACK_VOTE}.")
+                    self._journal_vote(agent, step, True)
+                results.append(fallback)
+                continue
+            remaining = None if timeout is None else max(0.0, started + timeout - time.monotonic())
+            try:
+                results.append(future.result(timeout=remaining))
+                late = False
+            except FutureTimeoutError:
+                late = agent.ticket.abandon()
+                if late:
+                    print(f"{agent.name} did not vote within {timeout}s. Using fallback vote {self.FALLBACK_VOTE}.")
+                    results.append(fallback)
+                else:
+                    results.append(future.result())  # Finished just as the deadline passed
+            if timeout is not None:
+                self._journal_vote(agent, step, late)
+        return results
+
+    def _replays_fallback(self, agent, step) -> bool:
+        return self.journal is not None and step is not None and self.journal.replays_fallback(agent.name, step)
+
+    def _journal_vote(self, agent, step, fallback: bool):
+        if self.journal is not None and step is not None:
+            self.journal.journal_vote(agent.name, step, fallback)
+
     def _resolve_votes_with_weighting(self, votes: List[dict]) -> Tuple[str, float]:
         """
         Resolves the collected votes into a single decision using confidence as a weight.
@@ -30,7 +167,7 @@ class Debate:
 
         buy_strength = sum(v['confidence'] for v in votes if v['decision'] == 'BUY')
         sell_strength = sum(v['confidence'] for v in votes if v['decision'] == 'SELL')
-        
+
         # Normalize by the sum of all confidences to get a weighted average
         total_confidence = sum(v['confidence'] for v in votes)
         if total_confidence == 0:
@@ -0,0 +1,68 @@
+import numpy as np
+
+INDICATOR_COLUMNS = ('close', 'rsi', 'macd', 'upper_band', 'lower_band')
+PRECISION = {'rsi': 1}  # Decimal places per column; everything else uses DEFAULT_PRECISION
+DEFAULT_PRECISION = 2
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token), good enough for budgeting prompts."""
+    return (len(text) + 3) // 4
+
+def _format_times(index) -> np.ndarray:
+    values = np.asarray(index.values)
+    if not np.issubdtype(values.dtype, np.datetime64):
+        return values.astype(str)
+    days = values.astype('datetime64[D]')
+    unit = 'D' if (values == days).all() else 'm'  # Drop the time of day for daily bars
+    return np.datetime_as_string(values, unit=unit)
+
+def format_values(values, precision: int = DEFAULT_PRECISION) -> list:
+    """Formats numbers with fixed precision, writing missing values as 'NA'."""
+    return ['NA' if value != value else f"{value:.{precision}f}" for value in np.asarray(values, dtype='float64').tolist()]
+
+def render_window(title: str, frame, rows: int, columns=INDICATOR_COLUMNS, max_tokens: int = None, reserved: str = '') -> str:
+    """
+    Renders the last `rows` rows of `frame` as a compact comma-separated table under `title`,
+    reading the column arrays directly instead of going through DataFrame.to_string.
+
+    :param max_tokens: Token budget for the whole prompt. The oldest rows are dropped until the
+                       table plus `reserved` (the rest of the prompt) fits; at least one row is kept.
+    :param reserved: The rest of the prompt, counted against `max_tokens`.
+    """
+    tail = frame.iloc[-rows:]
+    columns = [column for column in columns if column in tail.columns]
+    formatted = [format_values(tail[column].to_numpy(), PRECISION.get(column, DEFAULT_PRECISION)) for column in columns]
+    lines = [','.join(row) for row in zip(_format_times(tail.index), *formatted)]
+    header = ','.join(['time', *columns])
+
+    def render(kept):
+        return f"{title} (last {len(kept)} data points):\n{header}\n" + '\n'.join(kept) + '\n'
+
+    text = render(lines)
+    if max_tokens is not None:
+        budget = max_tokens - estimate_tokens(reserved)
+        while len(lines) > 1 and estimate_tokens(text) > budget:
+            # Drop as many of the oldest rows as the overshoot needs, at least one per pass
+            overshoot = estimate_tokens(text) - budget
+            row_tokens = max(1, estimate_tokens(lines[0]) + 1)
+            lines = lines[min(len(lines) - 1, max(1, -(-overshoot // row_tokens))):]
+            text = render(lines)
+    return text
+
+def moving_average_tail(values, window: int, count: int = 5) -> np.ndarray:
+    """
+    The last `count` values of a `window`-long simple moving average, computed from only the
+    last `window + count - 1` values instead of the whole series. NaN where the window is not full.
+    """
+    values = np.asarray(values, dtype='float64')
+    needed = values[-(window + count - 1):]
+    sums = np.convolve(needed, np.ones(window), mode='valid') / window
+    result = np.full(count, np.nan)
+    if len(sums):
+        result[-len(sums):] = sums[-count:]
+    return result
+
+def render_moving_average(frame, window: int, count: int = 5) -> str:
+    """One line with the last `count` values of the `window`-bar moving average of the close."""
+    values = moving_average_tail(frame['close'].to_numpy(), window, count)
+    return f"{window}-day Moving Average (last {count}): {', '.join(format_values(values))}\n"
@@ -0,0 +1,87 @@
+import math
+import threading
+
+class VoteGate:
+    """
+    Reuses an agent's previous vote for a ticker while its inputs have barely moved, instead of
+    asking the LLM again.
+
+    Inputs are fingerprinted as the latest close, RSI and MACD of the agent's memory layer, plus
+    the number of semantic memories visible to the ticker for agents that search them. A vote is
+    reused when, compared with the fingerprint of the last vote that came from the LLM, the close
+    moved less than `price_change` (relative), RSI less than `rsi_change`, MACD less than
+    `macd_change`, and no new semantic memory appeared.
+    """
+    def __init__(self, price_change: float = 0.01, rsi_change: float = 2.0, macd_change: float = 0.1,
+                 confidence_decay: float = 0.9, max_reuse: int = 3):
+        """
+        :param confidence_decay: Multiplies the confidence once more for every consecutive reuse.
+        :param max_reuse: Consecutive reuses allowed before the LLM is asked again regardless.
+        """
+        self.price_change = price_change
+        self.rsi_change = rsi_change
+        self.macd_change = macd_change
+        self.confidence_decay = confidence_decay
+        self.max_reuse = max_reuse
+        self.hits = 0
+        self.misses = 0
+        self._last = {}  # ticker -> (fingerprint, vote, confidence, reuses)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Builds a gate from a `gate` config dict, or returns None if it is not enabled."""
+        config = dict(config or {})
+        if not config.pop('enabled', False):
+            return None
+        return cls(**config)
+
+    @staticmethod
+    def fingerprint(frame, semantic_count=None) -> dict:
+        last = frame.iloc[-1]
+        return {
+            'ticker': last.get('ticker'),
+            'close': float(last['close']),
+            'rsi': float(last.get('rsi', math.nan)),
+            'macd': float(last.get('macd', math.nan)),
+            'semantic_count': semantic_count
+        }
+
+    def _unchanged(self, previous: dict, current: dict) -> bool:
+        # NaN comparisons are False, so missing indicators always count as a change
+        return (
+            abs(current['close'] / previous['close'] - 1) <= self.price_change
+            and abs(current['rsi'] - previous['rsi']) <= self.rsi_change
+            and abs(current['macd'] - previous['macd']) <= self.macd_change
+            and current['semantic_count'] == previous['semantic_count']
+        )
+
+    def lookup(self, fingerprint: dict):
+        """Returns the reused (vote, confidence) if the inputs barely moved, otherwise None."""
+        with self._lock:
+            last = self._last.get(fingerprint['ticker'])
+            if last is not None:
+                previous, vote, confidence, reuses = last
+                if reuses < self.max_reuse and self._unchanged(previous, fingerprint):
+                    reuses += 1
+                    self._last[fingerprint['ticker']] = (previous, vote, confidence, reuses)
+                    self.hits += 1
+                    return vote, confidence * self.confidence_decay ** reuses
+            self.misses += 1
+            return None
+
+    def store(self, fingerprint: dict, vote: str, confidence: float):
+        """Records a vote that came from the LLM as the new reference for the ticker."""
+        with self._lock:
+            self._last[fingerprint['ticker']] = (fingerprint, vote, confidence, 0)
+
+    def merge(self, hits: int, misses: int):
+        """Adds the counters of another gate, e.g. one used in a worker process."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def report(self, name: str) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"{name} vote gate: {self.hits} of {total} votes reused ({rate:.0%}), {self.misses} LLM calls."
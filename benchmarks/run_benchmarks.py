@@ -0,0 +1,320 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import argparse
+import contextlib
+import copy
+import hashlib
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import yaml
+from agents.base_agent import BaseAgent
+from agents.debate import Debate
+from feature_store import DEFAULT_INDICATORS, compute_features
+from llm.client import LLMClient
+from llm_stub_server import stub_answer
+from memory.memory_manager import MemoryManager
+from memory.semantic_memory import SemanticMemory
+from trader import Trader
+
+BENCHMARKS = ('memory_update', 'add_reflection', 'semantic_add', 'semantic_search', 'debate', 'indicators', 'backtest')
+NEWS_EVERY = 20  # One synthetic news item per ticker every this many bars
+
+class HashEncoder:
+    """
+    Stand-in for the sentence transformer: deterministic pseudo-random vectors seeded by a hash
+    of each text, so semantic memory can be benchmarked without loading a model.
+    """
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts, batch_size=None, **kwargs) -> np.ndarray:
+        seeds = [int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16) for text in texts]
+        return np.array([np.random.default_rng(seed).standard_normal(self.dimension) for seed in seeds], dtype='float32')
+
+class StubBackend:
+    """In-process LLM backend answering with the deterministic votes of the stub server."""
+    def generate(self, model_name: str, prompt: str) -> str:
+        return stub_answer(prompt)
+
+class StubAgent(BaseAgent):
+    """Deterministic agent voting on the latest RSI of its layer, without any LLM call."""
+    def __init__(self, name: str, layer: str):
+        super().__init__(name, {}, semantic_memory=None, llm=LLMClient(backend=StubBackend(), requests_per_second=0))
+        self.layer = layer
+
+    def build_prompt(self, memory_snapshot: dict):
+        return None
+
+    def vote(self, memory_snapshot: dict) -> tuple[str, float]:
+        frame = memory_snapshot[self.layer]
+        rsi = frame['rsi'].iloc[-1] if not frame.empty else np.nan
+        if rsi < 30:
+            return 'BUY', 0.8
+        if rsi > 70:
+            return 'SELL', 0.8
+        return 'HOLD', 0.5
+
+def base_shape(config: dict) -> tuple:
+    """(tickers, bars per ticker) of the configured historical data, which is the 1x scale."""
+    try:
+        counts = pd.read_csv(config['backtest']['full_data_path'], usecols=['ticker'])['ticker'].value_counts()
+        return list(counts.index), int(counts.max())
+    except (FileNotFoundError, KeyError, ValueError):
+        return ['AAPL', 'GOOG', 'MSFT'], 1174
+
+def synthetic_data(tickers: list, bars: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Random-walk prices in the layout of `historical_data_with_news.csv`, on an hourly clock so
+    long histories stay within pandas' timestamp range, with a news item every NEWS_EVERY bars.
+    As in the shipped CSV, the `news` column is empty.
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.date_range('2000-01-03', periods=bars, freq='h')
+    frames = []
+    for number, ticker in enumerate(tickers):
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, bars)))
+        spread = np.abs(rng.normal(0, 0.005, bars)) * close
+        has_news = (np.arange(bars) + number) % NEWS_EVERY == 0
+        news = np.where(has_news, [f"{ticker} synthetic headline {i}: outlook {('up', 'flat', 'down')[i % 3]}" for i in range(bars)], '')
+        frames.append(pd.DataFrame({
+            'time': times, 'ticker': ticker, 'close': close, 'high': close + spread, 'low': close - spread,
+            'open': close + rng.normal(0, 0.002, bars) * close, 'volume': rng.integers(10**6, 10**8, bars),
+            'news': np.nan, 'news_summary': np.where(has_news, news, 'No significant news')
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def ticker_frames(data: pd.DataFrame) -> dict:
+    """Per-ticker frames indexed by time, with the indicator columns the agents read."""
+    features = compute_features(data, DEFAULT_INDICATORS)
+    data = data.assign(**features)
+    return {ticker: frame.set_index('time') for ticker, frame in data.groupby('ticker', sort=False)}
+
+def decision_steps(frame: pd.DataFrame, interval: int) -> range:
+    return range(interval, len(frame), interval)
+
+def sample(steps, count: int) -> list:
+    """At most `count` steps spread evenly over `steps`."""
+    steps = list(steps)
+    if len(steps) <= count:
+        return steps
+    return [steps[i] for i in np.linspace(0, len(steps) - 1, count).astype(int)]
+
+def bench_memory_update(context: dict) -> int:
+    memory = MemoryManager(context['config']['memory_horizons'], snapshot_rows=context['config'].get('memory_snapshot_rows'))
+    ops = 0
+    for frame in context['frames'].values():
+        for i in decision_steps(frame, context['interval']):
+            memory.update_memory(frame.iloc[:i])
+            memory.get_memory_snapshot()
+            ops += 1
+    return ops
+
+def bench_add_reflection(context: dict) -> int:
+    memory = MemoryManager(context['config']['memory_horizons'], context['config'].get('reflection_log'))
+    ops = 0
+    for ticker, frame in context['frames'].items():
+        for i in decision_steps(frame, context['interval']):
+            memory.add_reflection(frame.index[i - 1], 'HOLD', 0.5, 'hold', f"[{ticker}] Decision: HOLD, Conf: 0.50.")
+            ops += 1
+    memory.reflection_memory  # Materialize the log once, as evaluate.py does
+    return ops
+
+def _news(context: dict) -> list:
+    data = context['data']
+    news = data[data['news'] != '']
+    return list(zip(news['news'], news['time'], news['ticker']))
+
+def _semantic_memory(context: dict) -> SemanticMemory:
+    memory = SemanticMemory(cache_size=context['config'].get('semantic_memory', {}).get('cache_size', 256))
+    memory._model = HashEncoder(memory.dimension)  # Skip loading the sentence transformer
+    return memory
+
+def bench_semantic_add(context: dict) -> int:
+    memory = _semantic_memory(context)
+    news = _news(context)
+    for text, timestamp, ticker in news:
+        memory.add_memory(text, timestamp=timestamp, ticker=ticker)
+    return len(news)
+
+def bench_semantic_search(context: dict, timer) -> int:
+    memory = _semantic_memory(context)
+    news = _news(context)
+    texts, timestamps, tickers = zip(*news)
+    memory.add_memories(list(texts), list(timestamps), list(tickers))
+
+    queries = sample(range(len(news)), context['max_ops'])
+    with timer:
+        for number, position in enumerate(queries):
+            # A fixed query (as the long-term agent uses) half the time, a new one otherwise
+            query = "market sentiment" if number % 2 else f"{tickers[position]} outlook {number}"
+            memory.search_memory(query, k=5, as_of=timestamps[position], ticker=tickers[position])
+    return len(queries)
+
+def bench_debate(context: dict, timer) -> int:
+    agents = [StubAgent(f"Stub {layer}", layer) for layer in MemoryManager.LAYERS]
+    debate_config = context['config'].get('debate', {})
+    debate = Debate(agents, concurrent=debate_config.get('concurrent', True), vote_timeout=debate_config.get('vote_timeout'))
+    memory = MemoryManager(context['config']['memory_horizons'], snapshot_rows=context['config'].get('memory_snapshot_rows'))
+    ops = 0
+    per_ticker = max(1, context['max_ops'] // len(context['frames']))
+    for frame in context['frames'].values():
+        for i in sample(decision_steps(frame, context['interval']), per_ticker):
+            memory.update_memory(frame.iloc[:i])
+            snapshot = memory.get_memory_snapshot()
+            with timer:
+                debate.run(snapshot)
+            ops += 1
+    return ops
+
+def bench_indicators(context: dict) -> int:
+    compute_features(context['data'], DEFAULT_INDICATORS)
+    return len(context['data'])
+
+def bench_backtest(context: dict, timer) -> int:
+    config = copy.deepcopy(context['config'])
+    directory = context['directory']
+    config['backtest'].update(full_data_path=context['data_path'], news_data_path=context['data_path'], workers=1)
+    config['data_cache'] = {'enabled': False}
+    config['feature_store'] = {'enabled': False}
+    config['llm'] = {**config.get('llm', {}), 'backend': 'gemini', 'requests_per_second': 0}
+    config['llm_cache'] = {'mode': 'off'}
+    config['semantic_memory'] = {**config.get('semantic_memory', {}), 'embedding_store': None, 'store': None}
+    config['reflection_log'] = {**config.get('reflection_log', {}), 'spill_dir': os.path.join(directory, 'reflections')}
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        trader = Trader(backtest_mode='all', config=config)
+        trader.llm._backend = StubBackend()  # Deterministic in-process answers instead of Gemini
+        trader.semantic_memory._model = HashEncoder(trader.semantic_memory.dimension)
+        with timer:
+            trader.run_backtest(workers=1)
+    return len(trader.signals)
+
+class Timer:
+    """Context manager adding up the time spent inside it."""
+    def __init__(self):
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed += time.perf_counter() - self._start
+
+TIMED_INSIDE = {'semantic_search': bench_semantic_search, 'debate': bench_debate, 'backtest': bench_backtest}
+TIMED_WHOLE = {'memory_update': bench_memory_update, 'add_reflection': bench_add_reflection,
+               'semantic_add': bench_semantic_add, 'indicators': bench_indicators}
+
+def run_benchmark(name: str, context: dict, repeats: int) -> dict:
+    """Runs one benchmark `repeats` times and returns its best and median wall time."""
+    times = []
+    for _ in range(repeats):
+        timer = Timer()
+        if name in TIMED_INSIDE:
+            ops = TIMED_INSIDE[name](context, timer)  # Setup is excluded from the timing
+        else:
+            with timer:
+                ops = TIMED_WHOLE[name](context)
+        times.append(timer.elapsed)
+    best = min(times)
+    return {
+        'benchmark': name,
+        'scale': context['scale'],
+        'rows': len(context['data']),
+        'ops': ops,
+        'best_seconds': best,
+        'median_seconds': statistics.median(times),
+        'per_op_us': best / ops * 1e6 if ops else None
+    }
+
+def git_revision() -> tuple:
+    """(short commit hash, whether the working tree has uncommitted changes)."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+def run_suite(config: dict, scales, benchmarks, repeats: int = 3, max_ops: int = 2000) -> dict:
+    tickers, bars = base_shape(config)
+    interval = config['backtest'].get('decision_interval', 5)
+    commit, dirty = git_revision()
+    results = []
+    with tempfile.TemporaryDirectory(prefix='ltm-bench-') as directory:
+        for scale in scales:
+            data = synthetic_data(tickers, int(bars * scale))
+            data_path = os.path.join(directory, f"synthetic_{scale}x.csv")
+            data.to_csv(data_path, index=False)
+            context = {
+                'config': config, 'scale': scale, 'data': data, 'data_path': data_path, 'directory': directory,
+                'frames': ticker_frames(data), 'interval': interval, 'max_ops': max_ops
+            }
+            print(f"\n{scale}x: {len(tickers)} tickers x {int(bars * scale)} bars ({len(data)} rows)")
+            for name in benchmarks:
+                result = run_benchmark(name, context, repeats)
+                results.append(result)
+                print(f"  {name:<16} {result['best_seconds']:>10.4f}s best, {result['median_seconds']:>10.4f}s median, "
+                      f"{result['ops']:>8} ops, {result['per_op_us'] or 0:>10.1f} us/op")
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeats': repeats,
+        'max_ops': max_ops,
+        'results': results
+    }
+
+def compare(baseline: dict, current: dict) -> pd.DataFrame:
+    """Best times of two result files side by side; a ratio above 1 means `current` is slower."""
+    key = ['benchmark', 'scale']
+    before = pd.DataFrame(baseline['results'])[key + ['best_seconds']]
+    after = pd.DataFrame(current['results'])[key + ['best_seconds']]
+    table = before.merge(after, on=key, suffixes=('_baseline', '_current'))
+    table['ratio'] = table['best_seconds_current'] / table['best_seconds_baseline']
+    return table
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the backtest hot paths on synthetic data.")
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10, 100], help="Multiples of the configured dataset's length.")
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per benchmark; the best and median times are reported.")
+    parser.add_argument('--max-ops', type=int, default=2000, help="Operations sampled by the search and debate benchmarks.")
+    parser.add_argument('--output', default=None, help="Results file. Defaults to benchmarks/results/<commit>.json.")
+    parser.add_argument('--compare', default=None, help="Earlier results file to compare against.")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    scales = [int(scale) if float(scale).is_integer() else scale for scale in args.scales]
+    report = run_suite(config, scales, args.benchmarks, args.repeats, args.max_ops)
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results',
+                                         f"{report['commit']}{'-dirty' if report['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nBenchmark results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        print(f"\nBaseline {baseline['commit']} vs current {report['commit']} (ratio above 1 is slower):")
+        print(compare(baseline, report).to_string(index=False, float_format=lambda value: f"{value:.4f}"))
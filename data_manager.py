@@ -1,13 +1,27 @@
 from data.price_fetcher import fetch_price_data
 from data.sentiment_fetcher import fetch_sentiment_data
+import copy
+import hashlib
+import glob
+import os
+import numpy as np
 import pandas as pd
 import time
 import yaml
 
 class DataManager:
-    def __init__(self, config, backtest_mode=None):
+    PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+    CATEGORICAL_COLUMNS = ('ticker', 'news', 'news_summary')
+    CACHE_FORMAT = 2  # Bumped whenever _compact changes, so older cached copies are rebuilt
+
+    def __init__(self, config, backtest_mode=None, period=None):
+        """
+        :param backtest_mode: 'train' or 'test' to load the configured period, 'all' for the whole file.
+        :param period: Optional (start, end) overriding the period of `backtest_mode`.
+        """
         self.config = config
         self.backtest_mode = backtest_mode
+        self.period = period
         self.all_historical_data = pd.DataFrame()
         self.tickers = []
         
@@ -22,38 +36,21 @@ class DataManager:
         
         try:
             print(f"Attempting to load data with news from {news_data_path}...")
-            self.all_historical_data = pd.read_csv(
-                news_data_path, 
-                parse_dates=['time']
-            )
+            self.all_historical_data = self._read_csv(news_data_path)
             print(f"Successfully loaded data with news from {news_data_path}")
         except FileNotFoundError:
             print(f"News data not found at {news_data_path}, loading regular data from {data_path}...")
-            self.all_historical_data = pd.read_csv(
-                data_path, 
-                parse_dates=['time']
-            )
+            self.all_historical_data = self._read_csv(data_path)
             # Add placeholder news column if not present
             if 'news_summary' not in self.all_historical_data.columns:
                 self.all_historical_data['news_summary'] = 'No significant news'
         
-        self.tickers = self.all_historical_data['ticker'].unique()
+        self.tickers = list(self.all_historical_data['ticker'].unique())
         
-        if self.backtest_mode == 'train':
-            start_date = pd.to_datetime(self.config['backtest']['training_period']['start'])
-            end_date = pd.to_datetime(self.config['backtest']['training_period']['end'])
-        elif self.backtest_mode == 'test':
-            start_date = pd.to_datetime(self.config['backtest']['testing_period']['start'])
-            end_date = pd.to_datetime(self.config['backtest']['testing_period']['end'])
-        else:
-            raise ValueError("Invalid backtest mode specified. Choose 'train' or 'test'.")
-
-        self.all_historical_data = self.all_historical_data[
-            (self.all_historical_data['time'] >= start_date) & 
-            (self.all_historical_data['time'] <= end_date)
-        ]
-        self.backtest_iterator = self.all_historical_data.groupby('ticker')
-        print(f"Historical data for {self.backtest_mode}ing loaded for tickers: {self.tickers}.")
+        self._index_tickers()
+        self._select_period(*self._period_bounds())
+        period = f"{self.period[0]} to {self.period[1]}" if self.period is not None else f"{self.backtest_mode}ing"
+        print(f"Historical data for {period} loaded for tickers: {self.tickers}.")
         
         # Check if news data is available
         if 'news_summary' in self.all_historical_data.columns:
@@ -62,13 +59,126 @@ class DataManager:
         else:
             print("No news data available in the dataset")
 
+    def _period_bounds(self):
+        if self.period is not None:
+            return pd.to_datetime(self.period[0]), pd.to_datetime(self.period[1])
+        if self.backtest_mode == 'train':
+            period = self.config['backtest']['training_period']
+        elif self.backtest_mode == 'test':
+            period = self.config['backtest']['testing_period']
+        elif self.backtest_mode == 'all':
+            return None, None
+        else:
+            raise ValueError("Invalid backtest mode specified. Choose 'train', 'test' or 'all'.")
+        return pd.to_datetime(period['start']), pd.to_datetime(period['end'])
+
+    def _select_period(self, start_date, end_date):
+        """
+        Keeps only the rows between `start_date` and `end_date` (inclusive; None is unbounded).
+        Each ticker's times are sorted, so its range is found by binary search instead of comparing
+        every row.
+        """
+        if start_date is None and end_date is None:
+            return
+        ranges = []
+        for rows in self._ticker_slices.values():
+            times = self._times[rows]
+            first = 0 if start_date is None else times.searchsorted(start_date, side='left')
+            last = len(times) if end_date is None else times.searchsorted(end_date, side='right')
+            ranges.append(np.arange(rows.start + first, rows.start + last))
+        selected = np.concatenate(ranges) if ranges else np.empty(0, dtype='int64')
+        self.all_historical_data = self.all_historical_data.take(selected).reset_index(drop=True)
+        self._index_tickers(presorted=True)
+
+    def window(self, start, end):
+        """
+        Returns a DataManager restricted to [start, end], sliced from this one's data without
+        reading the file again. Used for walk-forward windows.
+        """
+        windowed = copy.copy(self)
+        windowed.period = (start, end)
+        windowed._select_period(pd.to_datetime(start), pd.to_datetime(end))
+        return windowed
+
+    def _index_tickers(self, presorted=False):
+        """
+        Sorts the data by ticker and time so every ticker's rows are contiguous, and records where
+        each ticker's rows start and stop. `get_data_for_ticker` then only slices the column arrays.
+        """
+        data = self.all_historical_data
+        if not presorted:
+            data = data.sort_values(['ticker', 'time'], kind='stable').reset_index(drop=True)
+        self.all_historical_data = data
+        self._columns = {
+            column: data[column].array if isinstance(data[column].dtype, pd.CategoricalDtype) else data[column].to_numpy()
+            for column in data.columns if column != 'time'
+        }
+        self._times = pd.DatetimeIndex(data['time'], name='time')
+
+        tickers = data['ticker'].to_numpy()
+        starts = [0] + (np.flatnonzero(tickers[1:] != tickers[:-1]) + 1).tolist() if len(tickers) else []
+        stops = starts[1:] + [len(tickers)]
+        self._ticker_slices = {tickers[start]: slice(start, stop) for start, stop in zip(starts, stops)}
+
+    def _read_csv(self, path):
+        """
+        Reads a historical data CSV, going through a Parquet copy in `data_cache.directory` that is
+        rebuilt whenever the CSV's size or modification time changes. The cached copy stores
+        tickers and news text as categoricals and prices as `data_cache.price_dtype`.
+        """
+        cache_config = self.config.get('data_cache', {})
+        source = os.stat(path)  # Raises FileNotFoundError like read_csv would
+        if not cache_config.get('enabled', True):
+            return self._compact(pd.read_csv(path, parse_dates=['time']), cache_config)
+
+        price_dtype = cache_config.get('price_dtype', 'float32')
+        key = hashlib.sha1(f"{os.path.abspath(path)}|{source.st_size}|{source.st_mtime_ns}|{price_dtype}|{self.CACHE_FORMAT}".encode('utf-8')).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        directory = cache_config.get('directory', '.cache/data')
+        cache_path = os.path.join(directory, f"{stem}-{key}.parquet")
+        if os.path.exists(cache_path):
+            print(f"Reading cached copy of {path} from {cache_path}")
+            return pd.read_parquet(cache_path)
+
+        data = self._compact(pd.read_csv(path, parse_dates=['time']), cache_config)
+        os.makedirs(directory, exist_ok=True)
+        for stale_path in glob.glob(os.path.join(directory, f"{stem}-*.parquet")):
+            os.remove(stale_path)
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        data.to_parquet(temporary_path, index=False)
+        os.replace(temporary_path, cache_path)
+        print(f"Cached {path} as {cache_path}")
+        return data
+
+    def _compact(self, data, cache_config):
+        """
+        Converts tickers and news text to categoricals and prices to the configured float type.
+        Columns with no values at all are left as read: Parquet would hand an empty categorical
+        back as float64, and the cached copy must match a freshly read one.
+        """
+        price_dtype = cache_config.get('price_dtype', 'float32')
+        for column in self.PRICE_COLUMNS:
+            if column in data.columns:
+                data[column] = data[column].astype(price_dtype)
+        for column in self.CATEGORICAL_COLUMNS:
+            if column in data.columns and data[column].notna().any():
+                data[column] = data[column].astype('category')
+        return data
+
     def get_data_for_ticker(self, ticker):
-        """Returns the historical data for a specific ticker."""
+        """
+        Returns the historical data for a specific ticker, indexed by time. The columns are views
+        of the loaded data rather than copies; adding columns to the returned frame is safe.
+        """
         if self.backtest_mode:
-            try:
-                return self.backtest_iterator.get_group(ticker).set_index('time')
-            except KeyError:
+            rows = self._ticker_slices.get(ticker)
+            if rows is None:
                 return pd.DataFrame()
+            return pd.DataFrame(
+                {column: values[rows] for column, values in self._columns.items()},
+                index=self._times[rows],
+                copy=False
+            )
         else:
             # Live mode would fetch data for a specific ticker
             return pd.DataFrame()
@@ -1,13 +1,19 @@
+from startup_profile import startup_profile, PROFILE_FLAG  # Imported first so it can time the imports below
+import argparse
 import pandas as pd
 from trader import Trader
-import matplotlib.pyplot as plt
+from report import downsample, plot_decision_distribution, plot_series, start_rendering
 import os
-import numpy as np
 
 def evaluate_performance(trader: Trader):
     """
     Evaluates the performance of the trading bot and saves the results.
+
+    Charts are rendered headless in `report.workers` processes, from series downsampled to at
+    most `report.max_points` points; the summary report is written while they render.
     """
+    report_config = trader.config.get('report', {})
+    max_points = report_config.get('max_points')
     results_dir = 'documentation/results'
     os.makedirs(results_dir, exist_ok=True)
 
@@ -28,86 +34,71 @@ def evaluate_performance(trader: Trader):
     total_trades = len(reflections[reflections['decision'] != 'HOLD'])
     
     print(f"Total Trades Executed: {total_trades}")
-    
-    # Plot Decision Distribution
-    plt.figure(figsize=(8, 6))
-    decision_counts = reflections['decision'].value_counts()
-    decision_counts.plot(kind='pie', autopct='%1.1f%%', colors=['skyblue', 'salmon', 'lightgrey'])
-    plt.title('Trade Decision Distribution (BUY/SELL/HOLD)')
-    plt.ylabel('')
-    decision_plot_path = os.path.join(results_dir, 'decision_distribution_pie_chart.png')
-    plt.savefig(decision_plot_path)
-    plt.close()
-    print(f"Decision distribution chart saved to {decision_plot_path}")
-
-    # Plot Portfolio Performance 
-    plt.figure(figsize=(14, 8))
+
+    # Chart jobs: decision distribution, one chart per ticker and all tickers together
+    jobs = [(plot_decision_distribution, (reflections['decision'].value_counts().to_dict(), os.path.join(results_dir, 'decision_distribution_pie_chart.png')))]
+    all_series = []
     for ticker, portfolio in trader.portfolios.items():
         if portfolio['value_history']:
             # Agent's performance
-            df = pd.DataFrame(portfolio['value_history'], columns=['time', 'value']).set_index('time')
-            plt.plot(df.index, df['value'], label=f'{ticker} Agent Portfolio')
-            
+            times, values = zip(*portfolio['value_history'])
+            agent_series = (f'{ticker} Agent Portfolio', *downsample(pd.DatetimeIndex(times).values, values, max_points), '-')
+
             # Buy and Hold benchmark
-            ticker_data = trader.data_manager.get_data_for_ticker(ticker)
-            buy_and_hold_value = (10000 / ticker_data['close'].iloc[0]) * ticker_data['close']
-            plt.plot(ticker_data.index, buy_and_hold_value, label=f'{ticker} Buy & Hold', linestyle='--')
-    
-    plt.title('Portfolio Value Over Time vs. Buy and Hold')
-    plt.xlabel('Time')
-    plt.ylabel('Portfolio Value ($)')
-    plt.legend()
-    plt.grid(True)
-    portfolio_plot_path = os.path.join(results_dir, 'portfolio_performance.png')
-    plt.savefig(portfolio_plot_path)
-    plt.close()
-    print(f"Portfolio performance graph saved to {portfolio_plot_path}")
+            closes = trader.data_manager.get_data_for_ticker(ticker)['close']
+            buy_and_hold_value = (10000 / float(closes.iloc[0])) * closes.to_numpy(dtype='float64')
+            benchmark_series = (f'{ticker} Buy & Hold', *downsample(closes.index.values, buy_and_hold_value, max_points), '--')
+
+            jobs.append((plot_series, ([agent_series, benchmark_series], f'{ticker} Portfolio Value vs. Buy and Hold',
+                                       os.path.join(results_dir, f'portfolio_performance_{ticker}.png'))))
+            all_series.extend([agent_series, benchmark_series])
+    jobs.append((plot_series, (all_series, 'Portfolio Value Over Time vs. Buy and Hold', os.path.join(results_dir, 'portfolio_performance.png'))))
+    wait_for_charts = start_rendering(jobs, report_config.get('workers', 1))
 
     # Advanced Metrics & Summary Report 
     report_content = "# Trading Strategy Performance Report\n\nThis report analyzes the performance of the agent-based trading strategy against a 'Buy and Hold' benchmark.\n\n"
     for ticker, portfolio in trader.portfolios.items():
         if portfolio['value_history']:
-            # Correct Sharpe Ratio Calculation 
-            # Create a daily-indexed DataFrame
-            ticker_data = trader.data_manager.get_data_for_ticker(ticker)
-            portfolio_df = pd.DataFrame(portfolio['value_history'], columns=['time', 'value']).set_index('time')
-            daily_portfolio_values = portfolio_df.reindex(ticker_data.index).ffill()
-
-            # Calculate daily returns from the properly sampled series
-            daily_returns = daily_portfolio_values['value'].pct_change().dropna()
-            sharpe_ratio = np.sqrt(252) * daily_returns.mean() / daily_returns.std() if daily_returns.std() != 0 else 0
-            
-            # Max Drawdown 
-            cumulative_max = daily_portfolio_values['value'].cummax()
-            drawdown = (daily_portfolio_values['value'] - cumulative_max) / cumulative_max
-            max_drawdown = drawdown.min()
-            
-            # Buy & Hold Performance 
-            buy_and_hold_final_value = (10000 / ticker_data['close'].iloc[0]) * ticker_data['close'].iloc[-1]
-
+            # Accumulated step by step during the backtest; no need to rescan the value history
+            metrics = portfolio['metrics']
 
             report_content += f"## {ticker} Performance\n"
-            report_content += f"- **Agent Final Portfolio Value:** ${daily_portfolio_values['value'].iloc[-1]:,.2f}\n"
-            report_content += f"- **Buy & Hold Final Value:** ${buy_and_hold_final_value:,.2f}\n"
-            report_content += f"- **Sharpe Ratio (annualized daily):** {sharpe_ratio:.2f}\n"
-            report_content += f"- **Max Drawdown:** {max_drawdown:.2%}\n\n"
-            
+            report_content += f"- **Agent Final Portfolio Value:** ${metrics.value:,.2f}\n"
+            report_content += f"- **Buy & Hold Final Value:** ${metrics.benchmark_value:,.2f}\n"
+            report_content += f"- **Sharpe Ratio (annualized):** {metrics.sharpe:.2f} ({metrics.sharpe_definition})\n"
+            report_content += f"- **Rolling Sharpe Ratio (last {metrics.rolling_window} decisions):** {metrics.rolling_sharpe:.2f}\n"
+            report_content += f"- **Max Drawdown:** {metrics.max_drawdown:.2%}\n"
+            report_content += f"- **Turnover:** {metrics.turnover:.2f}x average portfolio value\n\n"
+
             print(f"\n {ticker} Advanced Metrics:")
-            print(f"Final Portfolio Value: ${daily_portfolio_values['value'].iloc[-1]:,.2f}")
-            print(f"Sharpe Ratio: {sharpe_ratio:.2f}")
-            print(f"Max Drawdown: {max_drawdown:.2%}")
+            print(f"Final Portfolio Value: ${metrics.value:,.2f}")
+            print(f"Sharpe Ratio: {metrics.sharpe:.2f} ({metrics.sharpe_definition})")
+            print(f"Max Drawdown: {metrics.max_drawdown:.2%}")
+            print(f"Turnover: {metrics.turnover:.2f}")
 
     summary_path = os.path.join(results_dir, 'summary_report.md')
     with open(summary_path, 'w') as f:
         f.write(report_content)
     print(f"\nSummary report saved to {summary_path}")
 
+    for chart_path in wait_for_charts():
+        print(f"Chart saved to {chart_path}")
+
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Backtest on the testing period and evaluate the results.")
+    parser.add_argument(PROFILE_FLAG, action='store_true', help="Print a breakdown of import and setup time before the backtest.")
+    args = parser.parse_args()
+
     # Run a backtest first
     print("Running backtest for evaluation...")
-    trader_for_evaluation = Trader(backtest_mode='test')
+    with startup_profile.stage('Trader construction'):
+        trader_for_evaluation = Trader(backtest_mode='test')
+    if args.profile_startup:
+        startup_profile.uninstall()
+        print(startup_profile.report())
     trader_for_evaluation.run_backtest()
+    trader_for_evaluation.save_signals()
     
     # Evaluate the results
     evaluate_performance(trader_for_evaluation)
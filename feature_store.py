@@ -0,0 +1,148 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+DEFAULT_INDICATORS = {
+    'rsi_window': 14,
+    'macd_short_window': 12,
+    'macd_long_window': 26,
+    'macd_signal_window': 9,
+    'bollinger_window': 20,
+    'bollinger_num_std_dev': 2
+}
+
+class FeatureStore:
+    """
+    Computes the technical indicators for every ticker in one grouped pass and keeps them in a
+    Parquet file per source dataset, so later runs read them instead of recomputing.
+
+    The file is named after a hash of the ticker, time and close columns. Its columns are named
+    after the indicator parameters (e.g. `rsi_14`, `upper_band_20_2`), so sweeping a window only
+    computes and appends the columns that are not in the file yet.
+    """
+    FEATURES = ('rsi', 'macd', 'macd_signal', 'upper_band', 'lower_band')
+
+    def __init__(self, directory: str = None):
+        """
+        :param directory: Where feature files are written. None keeps features in memory only.
+        """
+        self.directory = directory
+        self._frames = {}  # data hash -> features computed or loaded in this process
+
+    @staticmethod
+    def data_hash(data: pd.DataFrame) -> str:
+        hashed = pd.util.hash_pandas_object(data[['ticker', 'time', 'close']], index=False)
+        return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()[:16]
+
+    @staticmethod
+    def column_names(params: dict) -> dict:
+        """Maps each feature to the stored column holding it for these indicator parameters."""
+        p = {**DEFAULT_INDICATORS, **(params or {})}
+        macd = f"{p['macd_short_window']}_{p['macd_long_window']}"
+        bands = f"{p['bollinger_window']}_{p['bollinger_num_std_dev']}"
+        return {
+            'rsi': f"rsi_{p['rsi_window']}",
+            'macd': f"macd_{macd}",
+            'macd_signal': f"macd_signal_{macd}_{p['macd_signal_window']}",
+            'upper_band': f"upper_band_{bands}",
+            'lower_band': f"lower_band_{bands}"
+        }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"features-{key}.parquet")
+
+    def _load(self, key: str) -> pd.DataFrame:
+        if key in self._frames:
+            return self._frames[key]
+        frame = None
+        if self.directory and os.path.exists(self._path(key)):
+            frame = pd.read_parquet(self._path(key))
+        self._frames[key] = frame
+        return frame
+
+    def _save(self, key: str, frame: pd.DataFrame):
+        self._frames[key] = frame
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Written to a temporary file first so parallel workers never read a partial file.
+        temporary_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        frame.to_parquet(temporary_path, index=False)
+        os.replace(temporary_path, self._path(key))
+
+    def get_features(self, data: pd.DataFrame, params: dict = None) -> pd.DataFrame:
+        """
+        Returns the indicators for `data` (all tickers, with 'ticker', 'time' and 'close' columns)
+        as a frame with 'ticker', 'time' and one column per feature in FEATURES, row-aligned with
+        `data`. Only columns missing from the stored file are computed.
+        """
+        names = self.column_names(params)
+        key = self.data_hash(data)
+        stored = self._load(key)
+        if stored is not None and len(stored) != len(data):
+            stored = None  # Hash collision or a truncated file; start over
+
+        missing = [feature for feature, column in names.items() if stored is None or column not in stored.columns]
+        if missing:
+            computed = compute_features(data, {**DEFAULT_INDICATORS, **(params or {})}, missing)
+            if stored is None:
+                stored = pd.DataFrame({'ticker': data['ticker'].to_numpy(), 'time': data['time'].to_numpy()})
+            else:
+                stored = stored.copy()
+            for feature in missing:
+                stored[names[feature]] = computed[feature]
+            print(f"Computed {len(missing)} feature column(s) for {data['ticker'].nunique()} tickers: {', '.join(names[f] for f in missing)}")
+            self._save(key, stored)
+
+        features = stored[['ticker', 'time'] + [names[feature] for feature in self.FEATURES]]
+        return features.rename(columns={column: feature for feature, column in names.items()})
+
+def compute_features(data: pd.DataFrame, params: dict, features=FeatureStore.FEATURES) -> dict:
+    """
+    Computes the requested features for all tickers at once with grouped rolling/ewm operations.
+    Each ticker's values match what `trader.calculate_rsi`, `calculate_macd` and
+    `calculate_bollinger_bands` return for that ticker alone.
+
+    :return: {feature: float64 array row-aligned with `data`}
+    """
+    frame = pd.DataFrame({'ticker': data['ticker'].to_numpy(), 'close': data['close'].to_numpy(dtype='float64')})
+    close = frame.groupby('ticker', observed=True, sort=False)['close']
+
+    def grouped(series, method, *args, **kwargs):
+        # Grouped rolling/ewm results are indexed by (ticker, row); put them back in row order.
+        result = getattr(series.groupby(frame['ticker'], observed=True, sort=False), method)(*args, **kwargs).mean()
+        return result.droplevel(0).sort_index().to_numpy()
+
+    result = {}
+    if 'rsi' in features:
+        delta = close.diff()
+        window = params['rsi_window']
+        gain = grouped(delta.where(delta > 0, 0), 'rolling', window=window)
+        loss = grouped(-delta.where(delta < 0, 0), 'rolling', window=window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result['rsi'] = 100 - (100 / (1 + gain / loss))
+    if 'macd' in features or 'macd_signal' in features:
+        short_ema = grouped(frame['close'], 'ewm', span=params['macd_short_window'], adjust=False)
+        long_ema = grouped(frame['close'], 'ewm', span=params['macd_long_window'], adjust=False)
+        macd = pd.Series(short_ema - long_ema)
+        result['macd'] = macd.to_numpy()
+        result['macd_signal'] = grouped(macd, 'ewm', span=params['macd_signal_window'], adjust=False)
+    if 'upper_band' in features or 'lower_band' in features:
+        window = params['bollinger_window']
+        rolling = close.rolling(window=window)
+        mean = rolling.mean().droplevel(0).sort_index().to_numpy()
+        std = rolling.std().droplevel(0).sort_index().to_numpy()
+        result['upper_band'] = mean + std * params['bollinger_num_std_dev']
+        result['lower_band'] = mean - std * params['bollinger_num_std_dev']
+    return {feature: result[feature] for feature in features}
+
+if __name__ == '__main__':
+    import yaml
+    from data_manager import DataManager
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+    data_manager = DataManager(config, backtest_mode='train')
+    store = FeatureStore(config.get('feature_store', {}).get('directory'))
+    print(store.get_features(data_manager.all_historical_data, config.get('indicators')).tail())
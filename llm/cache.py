@@ -0,0 +1,117 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+class ReplayCacheMiss(KeyError):
+    """Raised in replay mode when a prompt has no recorded response."""
+
+class ResponseCache:
+    """
+    Persistent, content-addressed cache of LLM responses keyed on (model, prompt hash).
+
+    Modes:
+    - 'record': serve hits from the cache, call the model on a miss and store the response.
+    - 'replay': serve only from the cache and raise `ReplayCacheMiss` on a miss, so a run is
+                exactly reproducible and never touches the API.
+    - 'off':    bypass the cache entirely.
+
+    Alongside the responses it keeps a decision journal of the votes for which a recorded run
+    used the debate's fallback vote (the agent missed its deadline or was still busy). Replays
+    read the journal first and use the fallback again instead of asking the agent.
+    """
+    MODES = ('record', 'replay', 'off')
+
+    def __init__(self, path: str, mode: str = 'record'):
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid LLM cache mode '{mode}'. Choose one of {self.MODES}.")
+        self.path = path
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        self._fallbacks = set()  # Journal keys of the votes that used the fallback
+        if mode != 'off':
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Agents vote from several threads, and parallel backtests share the file across processes.
+            self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT, response TEXT, created REAL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS fallbacks ("
+                "key TEXT PRIMARY KEY, agent TEXT, step TEXT, created REAL)"
+            )
+            self._connection.commit()
+            self._fallbacks = {row[0] for row in self._connection.execute("SELECT key FROM fallbacks")}
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Builds a cache from the `llm_cache` config section, or returns None if it is disabled."""
+        config = config or {}
+        mode = config.get('mode', 'off')
+        if mode == 'off':
+            return None
+        return cls(config.get('path', '.cache/llm_responses.sqlite'), mode)
+
+    @staticmethod
+    def key(model_name: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{prompt}".encode('utf-8')).hexdigest()
+
+    def get(self, model_name: str, prompt: str):
+        """Returns the cached response text, or None on a miss (raises on a miss in replay mode)."""
+        if self.mode == 'off':
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM responses WHERE key = ?", (self.key(model_name, prompt),)
+            ).fetchone()
+            if row is not None:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+        if self.mode == 'replay':
+            raise ReplayCacheMiss(f"No cached {model_name} response for prompt hash {self.key(model_name, prompt)[:12]}.")
+        return None
+
+    def put(self, model_name: str, prompt: str, response: str):
+        if self.mode != 'record':
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created) VALUES (?, ?, ?, ?)",
+                (self.key(model_name, prompt), model_name, response, time.time())
+            )
+            self._connection.commit()
+
+    def replays_fallback(self, agent_name: str, step: str) -> bool:
+        """Whether a replay should use the fallback vote for `agent_name` at `step`, as recorded."""
+        return self.mode == 'replay' and self.key(agent_name, step) in self._fallbacks
+
+    def journal_vote(self, agent_name: str, step: str, fallback: bool):
+        """
+        Records whether the vote of `agent_name` at `step` used the fallback. Only fallbacks are
+        stored, so the journal is only written when the outcome of a step changes.
+        """
+        if self.mode != 'record':
+            return
+        key = self.key(agent_name, step)
+        with self._lock:
+            if fallback and key not in self._fallbacks:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO fallbacks (key, agent, step, created) VALUES (?, ?, ?, ?)",
+                    (key, agent_name, step, time.time())
+                )
+                self._fallbacks.add(key)
+            elif not fallback and key in self._fallbacks:
+                self._connection.execute("DELETE FROM fallbacks WHERE key = ?", (key,))
+                self._fallbacks.discard(key)
+            else:
+                return
+            self._connection.commit()
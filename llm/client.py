@@ -0,0 +1,277 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+import numpy as np
+import requests
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter: `rate` tokens are added per second up to `burst`.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class LatencyStats:
+    """
+    Per-call latency and outcome counters, keeping the last `window` latencies for percentiles.
+    """
+    def __init__(self, window: int = 10000):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.total_latency = 0.0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, retries: int, failed: bool):
+        with self._lock:
+            self.calls += 1
+            self.retries += retries
+            self.errors += int(failed)
+            self.total_latency += latency
+            self._latencies.append(latency)
+
+    def record_cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    def counters(self) -> dict:
+        """The raw counters and recent latencies, picklable, e.g. to return from a worker process."""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'errors': self.errors,
+                'retries': self.retries,
+                'cache_hits': self.cache_hits,
+                'total_latency': self.total_latency,
+                'latencies': list(self._latencies)
+            }
+
+    def merge(self, counters: dict):
+        """Adds counters returned by another client's `counters()`."""
+        with self._lock:
+            self.calls += counters['calls']
+            self.errors += counters['errors']
+            self.retries += counters['retries']
+            self.cache_hits += counters['cache_hits']
+            self.total_latency += counters['total_latency']
+            self._latencies.extend(counters['latencies'])
+
+    def summary(self) -> dict:
+        with self._lock:
+            latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+            return {
+                'calls': self.calls,
+                'cache_hits': self.cache_hits,
+                'errors': self.errors,
+                'retries': self.retries,
+                'mean_latency': self.total_latency / self.calls if self.calls else 0.0,
+                'p50_latency': float(np.percentile(latencies, 50)),
+                'p95_latency': float(np.percentile(latencies, 95)),
+                'max_latency': float(latencies.max())
+            }
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether a failed call is worth retrying: rate limiting (HTTP 429), server errors (5xx),
+    timeouts and connection errors. Anything else, such as a bad request or an invalid API key,
+    fails the same way on every attempt.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError, requests.Timeout, requests.ConnectionError)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+    else:
+        # google.api_core errors carry their HTTP status in `code`
+        status = getattr(error, 'code', None)
+    return isinstance(status, int) and (status == 429 or 500 <= status < 600)
+
+class GeminiBackend:
+    """Calls Google Gemini through google.generativeai, configured once per process."""
+    def __init__(self, api_key: str = None):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key or os.getenv("GEMINI_API_KEY"))
+        self._genai = genai
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def generate(self, model_name: str, prompt: str) -> str:
+        with self._lock:
+            if model_name not in self._models:
+                self._models[model_name] = self._genai.GenerativeModel(model_name)
+        return self._models[model_name].generate_content(prompt).text
+
+class HTTPBackend:
+    """
+    Posts to a Gemini-compatible `generateContent` REST endpoint, such as the local stub in
+    `scripts/llm_stub_server.py`. A single pooled `requests.Session` is reused for all calls.
+    """
+    def __init__(self, base_url: str, api_key: str = None, timeout: float = 60.0, pool_size: int = 10):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def generate(self, model_name: str, prompt: str) -> str:
+        url = f"{self.base_url}/v1beta/models/{model_name}:generateContent"
+        params = {'key': self.api_key} if self.api_key else None
+        payload = {'contents': [{'parts': [{'text': prompt}]}]}
+        response = self.session.post(url, json=payload, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        parts = response.json()['candidates'][0]['content']['parts']
+        return ''.join(part.get('text', '') for part in parts)
+
+class LLMResponse:
+    """Minimal response object; agents only read `text`."""
+    def __init__(self, text: str):
+        self.text = text
+
+class LLMModel:
+    """Binds a model name to a client so agents can keep calling `generate_content(prompt).text`."""
+    def __init__(self, client, model_name: str):
+        self.client = client
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str, cache: bool = True) -> LLMResponse:
+        return LLMResponse(self.client.generate(self.model_name, prompt, cache=cache))
+
+class LLMClient:
+    """
+    LLM client shared by all agents: response cache, bounded concurrency, token-bucket rate
+    limiting, retries with exponential backoff and full jitter, and per-call latency stats in
+    front of a pluggable backend.
+    """
+    def __init__(self, backend=None, model: str = 'gemini-1.5-flash', cache=None,
+                 requests_per_second: float = 1.0, burst: int = 5, max_concurrency: int = 4,
+                 max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 30.0):
+        """
+        :param backend: Object with `generate(model_name, prompt) -> str`. Defaults to Gemini.
+        :param model: Default model name for `model()`.
+        :param cache: Optional ResponseCache consulted before any API call.
+        :param requests_per_second: Sustained request rate; 0 disables rate limiting.
+        :param burst: Requests that may be sent back to back before the rate applies.
+        :param max_concurrency: Maximum number of in-flight requests.
+        :param max_retries: Retries after a retryable failure before the error is raised.
+        :param backoff_base: Base delay in seconds, doubled on every retry.
+        :param backoff_max: Upper bound for a single backoff delay.
+        """
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+        self.default_model = model
+        self.cache = cache
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = LatencyStats()
+
+    @classmethod
+    def from_config(cls, config: dict, cache=None):
+        """Builds a client from the `llm` config section."""
+        config = config or {}
+        backend_name = config.get('backend', 'gemini')
+        if backend_name == 'http':
+            backend = HTTPBackend(
+                config.get('base_url', 'http://127.0.0.1:8765'),
+                timeout=config.get('timeout', 60.0),
+                pool_size=config.get('max_concurrency', 4)
+            )
+        elif backend_name == 'gemini':
+            backend = None  # Created on the first uncached call
+        else:
+            raise ValueError(f"Unknown LLM backend '{backend_name}'. Choose 'gemini' or 'http'.")
+        return cls(
+            backend=backend,
+            model=config.get('model', 'gemini-1.5-flash'),
+            cache=cache,
+            requests_per_second=config.get('requests_per_second', 1.0),
+            burst=config.get('burst', 5),
+            max_concurrency=config.get('max_concurrency', 4),
+            max_retries=config.get('max_retries', 3),
+            backoff_base=config.get('backoff_base', 1.0),
+            backoff_max=config.get('backoff_max', 30.0)
+        )
+
+    @property
+    def backend(self):
+        with self._backend_lock:
+            if self._backend is None:
+                self._backend = GeminiBackend()
+            return self._backend
+
+    def model(self, model_name: str = None) -> LLMModel:
+        return LLMModel(self, model_name or self.default_model)
+
+    def generate(self, model_name: str, prompt: str, cache: bool = True) -> str:
+        """
+        Returns the model's response text, from the cache if possible. Only errors accepted by
+        `is_retryable` are retried; others are raised at once, and the last retryable error once
+        all retries are used up. Raises `ReplayCacheMiss` in replay mode.
+
+        :param cache: Store a new response in the cache. Without it the caller decides later
+                      whether to `remember` the response.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(model_name, prompt)
+            if cached is not None:
+                self.stats.record_cache_hit()
+                return cached
+
+        backend = self.backend
+        with self._slots:
+            start = time.monotonic()
+            for attempt in range(self.max_retries + 1):
+                self.rate_limiter.acquire()
+                try:
+                    text = backend.generate(model_name, prompt)
+                    break
+                except Exception as error:
+                    if attempt == self.max_retries or not is_retryable(error):
+                        self.stats.record(time.monotonic() - start, attempt, failed=True)
+                        raise
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+                    time.sleep(random.uniform(0, delay))
+            self.stats.record(time.monotonic() - start, attempt, failed=False)
+
+        if cache:
+            self.remember(model_name, prompt, text)
+        return text
+
+    def remember(self, model_name: str, prompt: str, text: str):
+        """Stores `text` in the response cache as the answer to `prompt`."""
+        if self.cache is not None:
+            self.cache.put(model_name, prompt, text)
+
+    def report(self) -> str:
+        summary = self.stats.summary()
+        return (
+            f"LLM calls: {summary['calls']} (cache hits: {summary['cache_hits']}, errors: {summary['errors']}, "
+            f"retries: {summary['retries']}). Latency mean/p50/p95/max: {summary['mean_latency']:.2f}s / "
+            f"{summary['p50_latency']:.2f}s / {summary['p95_latency']:.2f}s / {summary['max_latency']:.2f}s"
+        )
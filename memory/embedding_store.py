@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+class EmbeddingStore:
+    """
+    Read-only store of precomputed text embeddings.
+
+    On disk a store is a directory with:
+    - `vectors.f32`: a raw float32 matrix of shape (count, dimension), opened with np.memmap.
+    - `texts.jsonl`: one {"hash", "text"} line per row, in the same order as the vectors.
+    - `meta.json`:   model name, dimension and row count.
+
+    Build one with `scripts/precompute_embeddings.py`.
+    """
+    VECTORS_FILE = 'vectors.f32'
+    TEXTS_FILE = 'texts.jsonl'
+    META_FILE = 'meta.json'
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, self.META_FILE), 'r') as f:
+            meta = json.load(f)
+        self.directory = directory
+        self.model_name = meta['model']
+        self.dimension = meta['dimension']
+        self.count = meta['count']
+        self.vectors = np.memmap(
+            os.path.join(directory, self.VECTORS_FILE), dtype='float32', mode='r',
+            shape=(self.count, self.dimension)
+        ) if self.count else np.zeros((0, self.dimension), dtype='float32')
+        self.rows = {}
+        with open(os.path.join(directory, self.TEXTS_FILE), 'r', encoding='utf-8') as f:
+            for row, line in enumerate(f):
+                self.rows[json.loads(line)['hash']] = row
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def open(cls, directory: str):
+        """Opens the store in `directory`, or returns None if it has not been built."""
+        if not directory or not os.path.exists(os.path.join(directory, cls.META_FILE)):
+            return None
+        return cls(directory)
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, texts: list):
+        """
+        Returns (vectors, missing): a float32 array with one row per text (rows of missing texts
+        are left as zeros) and the positions of texts that are not in the store.
+        """
+        vectors = np.zeros((len(texts), self.dimension), dtype='float32')
+        missing = []
+        for position, text in enumerate(texts):
+            row = self.rows.get(self.text_hash(text))
+            if row is None:
+                missing.append(position)
+            else:
+                vectors[position] = self.vectors[row]
+        return vectors, missing
+
+    @classmethod
+    def build(cls, texts: list, model, model_name: str, directory: str, batch_size: int = 256):
+        """
+        Embeds every unique text once and writes the store to `directory`.
+
+        :param texts: Texts to embed; duplicates are embedded once.
+        :param model: A SentenceTransformer (anything with `encode(list) -> array`).
+        :param model_name: Name recorded in the metadata so mismatched stores can be detected.
+        :return: The opened store.
+        """
+        unique = list(dict.fromkeys(texts))
+        os.makedirs(directory, exist_ok=True)
+        dimension = model.get_sentence_embedding_dimension()
+
+        vectors = None
+        if unique:
+            vectors = np.memmap(
+                os.path.join(directory, cls.VECTORS_FILE), dtype='float32', mode='w+',
+                shape=(len(unique), dimension)
+            )
+        with open(os.path.join(directory, cls.TEXTS_FILE), 'w', encoding='utf-8') as f:
+            for start in range(0, len(unique), batch_size):
+                batch = unique[start:start + batch_size]
+                vectors[start:start + len(batch)] = model.encode(batch, batch_size=batch_size)
+                for text in batch:
+                    f.write(json.dumps({'hash': cls.text_hash(text), 'text': text}) + '\n')
+        if vectors is not None:
+            vectors.flush()
+            del vectors
+
+        with open(os.path.join(directory, cls.META_FILE), 'w') as f:
+            json.dump({'model': model_name, 'dimension': dimension, 'count': len(unique)}, f)
+        return cls(directory)
@@ -1,56 +1,127 @@
 import pandas as pd
 import yaml
+from memory.ring_buffer import RingBuffer
+from memory.reflection_log import ReflectionLog
 
 class MemoryManager:
-    def __init__(self, horizons: dict):
+    LAYERS = ('short_term', 'mid_term', 'long_term')
+
+    def __init__(self, horizons: dict, reflection_config: dict = None, snapshot_rows: int = None,
+                 snapshot_reflections: int = 0):
+        """
+        :param horizons: Sizes of the 'short_term', 'mid_term' and 'long_term' layers.
+        :param reflection_config: Optional 'chunk_size', 'spill_dir' and 'max_chunks_in_memory'
+                                  settings for the reflection log.
+        :param snapshot_rows: Most recent rows of each layer included in a memory snapshot.
+                              Agents only read the tail of a layer; None includes every row.
+        :param snapshot_reflections: Most recent reflections included in a memory snapshot under
+                                     'reflections'. No agent reads them, so 0 leaves them out.
+        """
         self.horizons = horizons
-        self.short_term_memory = pd.DataFrame()
-        self.mid_term_memory = pd.DataFrame()
-        self.long_term_memory = pd.DataFrame()
-        self.reflection_memory = pd.DataFrame(columns=['timestamp', 'decision', 'confidence', 'outcome', 'reflection'])
+        self.snapshot_rows = snapshot_rows
+        self.snapshot_reflections = snapshot_reflections
+        self.layers = {}  # ticker -> {layer name: RingBuffer}; each ticker's history is kept apart
+        self.current_ticker = None
+        self.reflection_log = ReflectionLog(**(reflection_config or {}))
+
+    @property
+    def short_term_memory(self) -> pd.DataFrame:
+        return self._view('short_term')
+
+    @property
+    def mid_term_memory(self) -> pd.DataFrame:
+        return self._view('mid_term')
+
+    @property
+    def long_term_memory(self) -> pd.DataFrame:
+        return self._view('long_term')
+
+    @property
+    def reflection_memory(self) -> pd.DataFrame:
+        return self.reflection_log.to_frame()
+
+    def _view(self, layer: str) -> pd.DataFrame:
+        # Copied, so the frame is not overwritten by later updates
+        if self.current_ticker not in self.layers:
+            return pd.DataFrame()
+        return self.layers[self.current_ticker][layer].view(copy=True)
+
+    def _ticker_layers(self, ticker) -> dict:
+        if ticker not in self.layers:
+            vocabularies = {}  # Shared, so each new row's text is encoded once for all layers
+            self.layers[ticker] = {layer: RingBuffer(self.horizons[layer], vocabularies) for layer in self.LAYERS}
+        return self.layers[ticker]
 
     def update_memory(self, new_data: pd.DataFrame):
         """
         Updates all memory layers with new data and ensures they do not exceed their configured size.
+
+        `new_data` may be the full history up to the current step; only the rows that are newer
+        than the last row already in memory are appended. Layers are kept per ticker (from the
+        'ticker' column), so several tickers can be tracked side by side. If the data starts
+        before the rows already stored for its ticker, that ticker's layers are reset.
         
         :param new_data: A DataFrame containing the new data points to add.
         """
         if new_data.empty:
             return
-            
-        # Update short-term memory
-        self.short_term_memory = pd.concat([self.short_term_memory, new_data])
-        if len(self.short_term_memory) > self.horizons['short_term']:
-            self.short_term_memory = self.short_term_memory.iloc[-self.horizons['short_term']:]
-            
-        # Update mid-term memory
-        self.mid_term_memory = pd.concat([self.mid_term_memory, new_data])
-        if len(self.mid_term_memory) > self.horizons['mid_term']:
-            self.mid_term_memory = self.mid_term_memory.iloc[-self.horizons['mid_term']:]
-            
-        # Update long-term memory
-        self.long_term_memory = pd.concat([self.long_term_memory, new_data]).tail(self.horizons['long_term'])
+
+        ticker = new_data['ticker'].iloc[-1] if 'ticker' in new_data.columns else None
+        layers = self._ticker_layers(ticker)
+        self.current_ticker = ticker
+
+        last_seen = layers['long_term'].last_index()
+        if last_seen is not None and new_data.index[-1] < last_seen:
+            for layer in layers.values():
+                layer.clear()
+            last_seen = None
+
+        if last_seen is not None:
+            start = new_data.index.searchsorted(last_seen, side='right')
+            new_data = new_data.iloc[start:]
+            if new_data.empty:
+                return
+
+        # Extract and encode the new rows once and share them between the three layers
+        index = new_data.index.to_numpy()
+        columns = layers['long_term'].encode(RingBuffer.columns_of(new_data))
+        for layer in layers.values():
+            layer.append_columns(index, columns, new_data.index.name, encoded=True)
+
+    def release(self, ticker):
+        """Drops the memory layers held for a ticker once it is no longer traded."""
+        self.layers.pop(ticker, None)
+        if self.current_ticker == ticker:
+            self.current_ticker = None
 
     def add_reflection(self, timestamp, decision, confidence, outcome, reflection):
-        new_reflection = pd.DataFrame({
-            'timestamp': [timestamp],
-            'decision': [decision],
-            'confidence': [confidence],
-            'outcome': [outcome],
-            'reflection': [reflection]
-        })
-        self.reflection_memory = pd.concat([self.reflection_memory, new_reflection], ignore_index=True)
-
-    def get_memory_snapshot(self) -> dict:
+        self.reflection_log.append(timestamp, decision, confidence, outcome, reflection)
+
+    def get_memory_snapshot(self, ticker=None) -> dict:
         """
         Returns a dictionary containing the current state of all memory layers.
+
+        Each layer holds its last `snapshot_rows` rows, copied out of the ring buffer so the
+        snapshot stays valid after later updates (agents may still be reading it from another
+        thread). The last `snapshot_reflections` reflections are included only if it is set; use
+        `reflection_memory` for the full log.
+
+        :param ticker: The ticker whose layers are returned. Defaults to the last updated ticker.
         """
-        return {
-            'short_term': self.short_term_memory,
-            'mid_term': self.mid_term_memory,
-            'long_term': self.long_term_memory,
-            'reflections': self.reflection_memory
-        }
+        ticker = self.current_ticker if ticker is None else ticker
+        snapshot = {layer: pd.DataFrame() for layer in self.LAYERS}
+        if ticker in self.layers:
+            # Every layer holds the latest rows of the same history, so copy the longest tail once
+            # and hand each layer the end of it
+            layers = self.layers[ticker]
+            sizes = {layer: min(len(layers[layer]), self.snapshot_rows or len(layers[layer])) for layer in self.LAYERS}
+            largest = max(self.LAYERS, key=lambda layer: len(layers[layer]))
+            tail = layers[largest].view(max(sizes.values()), copy=True)
+            for layer, size in sizes.items():
+                snapshot[layer] = tail if size == len(tail) else tail.iloc[len(tail) - size:]
+        if self.snapshot_reflections:
+            snapshot['reflections'] = self.reflection_log.recent(self.snapshot_reflections)
+        return snapshot
 
 if __name__ == '__main__':
 
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+class ReflectionLog:
+    """
+    Append-only, columnar store for agent reflections.
+
+    Rows are written into preallocated NumPy chunks of `chunk_size` rows. Full chunks are
+    sealed into DataFrames; when a `spill_dir` is configured, sealed chunks beyond
+    `max_chunks_in_memory` are written to Parquet and dropped from memory so long runs
+    stay bounded. Each log spills into its own temporary directory under `spill_dir`, which is
+    removed by `close()` or when the log is garbage collected.
+    """
+    COLUMNS = ['timestamp', 'decision', 'confidence', 'outcome', 'reflection']
+    DTYPES = {
+        'timestamp': 'datetime64[ns]',
+        'decision': object,
+        'confidence': 'float64',
+        'outcome': object,
+        'reflection': object
+    }
+
+    def __init__(self, chunk_size: int = 1024, spill_dir: str = None, max_chunks_in_memory: int = 8):
+        """
+        :param chunk_size: Number of rows preallocated per chunk.
+        :param spill_dir: Directory for Parquet spill files. Spilling is disabled if None.
+        :param max_chunks_in_memory: Sealed chunks kept in memory before the oldest are spilled.
+        """
+        if chunk_size <= 0:
+            raise ValueError("ReflectionLog chunk_size must be a positive integer.")
+        self.chunk_size = int(chunk_size)
+        self.spill_dir = spill_dir
+        self.max_chunks_in_memory = max_chunks_in_memory
+        self._run_dir = None
+        self._spilled_paths = []
+        self._spilled_rows = 0
+        self._sealed = []
+        self._chunk = self._new_chunk()
+        self._fill = 0
+
+    def __len__(self):
+        return self._spilled_rows + sum(len(chunk) for chunk in self._sealed) + self._fill
+
+    def _new_chunk(self) -> dict:
+        return {column: np.empty(self.chunk_size, dtype=self.DTYPES[column]) for column in self.COLUMNS}
+
+    def append(self, timestamp, decision, confidence, outcome, reflection):
+        """Appends a single reflection row."""
+        row = self._fill
+        self._chunk['timestamp'][row] = np.datetime64(pd.Timestamp(timestamp), 'ns')
+        self._chunk['decision'][row] = decision
+        self._chunk['confidence'][row] = confidence
+        self._chunk['outcome'][row] = outcome
+        self._chunk['reflection'][row] = reflection
+        self._fill += 1
+        if self._fill == self.chunk_size:
+            self._seal()
+
+    def extend(self, frame: pd.DataFrame):
+        """Appends every row of a DataFrame with the reflection columns (e.g. from another run)."""
+        for row in frame[self.COLUMNS].itertuples(index=False):
+            self.append(*row)
+
+    def _frame(self, chunk: dict, rows: int) -> pd.DataFrame:
+        return pd.DataFrame({column: chunk[column][:rows] for column in self.COLUMNS}, copy=False)
+
+    def _seal(self):
+        self._sealed.append(self._frame(self._chunk, self._fill))
+        self._chunk = self._new_chunk()
+        self._fill = 0
+        if self.spill_dir is not None:
+            while len(self._sealed) > self.max_chunks_in_memory:
+                self._spill(self._sealed.pop(0))
+
+    def _spill(self, chunk: pd.DataFrame):
+        if self._run_dir is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._run_dir = tempfile.TemporaryDirectory(prefix='reflections-', dir=self.spill_dir)
+        path = os.path.join(self._run_dir.name, f"chunk_{len(self._spilled_paths):06d}.parquet")
+        chunk.to_parquet(path, index=False)
+        self._spilled_paths.append(path)
+        self._spilled_rows += len(chunk)
+
+    def close(self):
+        """
+        Deletes the spilled chunks and their directory. Rows that were spilled are lost, so read
+        `to_frame()` first if the full log is still needed; rows held in memory are kept.
+        """
+        if self._run_dir is not None:
+            self._run_dir.cleanup()
+            self._run_dir = None
+        self._spilled_paths = []
+        self._spilled_rows = 0
+
+    def recent(self, n: int) -> pd.DataFrame:
+        """
+        Returns up to the last `n` reflections held in memory, without reading spilled chunks.
+        """
+        parts = [self._frame(self._chunk, self._fill)]
+        rows = self._fill
+        for chunk in reversed(self._sealed):
+            if rows >= n:
+                break
+            parts.insert(0, chunk)
+            rows += len(chunk)
+        if len(parts) == 1:
+            return parts[0].tail(n)
+        return pd.concat(parts, ignore_index=True).tail(n).reset_index(drop=True)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the full reflection log, including spilled chunks, as a single DataFrame.
+        """
+        parts = [pd.read_parquet(path) for path in self._spilled_paths]
+        parts += self._sealed
+        parts.append(self._frame(self._chunk, self._fill))
+        return pd.concat(parts, ignore_index=True)
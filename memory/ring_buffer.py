@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+
+class Vocabulary:
+    """
+    The distinct values of a text column, numbered in order of first appearance. Codes never
+    change once assigned, so buffers holding rows of the same data can share one vocabulary and
+    the values only need encoding once.
+    """
+    def __init__(self, categories=()):
+        self.dtype = pd.CategoricalDtype(pd.Index(categories))
+        self._lookup = {value: code for code, value in enumerate(self.dtype.categories)}
+        self._code_map = None  # (categorical dtype of the last input, its codes in this vocabulary)
+
+    def _codes(self, values) -> np.ndarray:
+        """Codes of distinct, non-missing `values`, adding the values not seen before."""
+        codes = np.empty(len(values), dtype=np.int32)
+        new_values = []
+        for position, value in enumerate(values):
+            code = self._lookup.get(value)
+            if code is None:
+                code = self._lookup[value] = len(self._lookup)
+                new_values.append(value)
+            codes[position] = code
+        if new_values:
+            self.dtype = pd.CategoricalDtype(self.dtype.categories.append(pd.Index(new_values)))
+        return codes
+
+    @staticmethod
+    def _remap(codes: np.ndarray, mapping: np.ndarray) -> np.ndarray:
+        # Only valid codes index the mapping; it is empty when every value is missing
+        result = np.full(len(codes), -1, dtype=np.int32)
+        valid = codes >= 0
+        result[valid] = mapping[codes[valid]]
+        return result
+
+    def encode(self, values) -> np.ndarray:
+        """Converts values (categorical, string or object) to codes; -1 marks missing values."""
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Slices of one categorical share its dtype, so the code mapping is reused between appends
+            if self._code_map is None or self._code_map[0] is not values.dtype:
+                self._code_map = (values.dtype, self._codes(values.categories))
+            return self._remap(values.codes, self._code_map[1])
+        codes, uniques = pd.factorize(values)
+        return self._remap(codes, self._codes(uniques))
+
+    def decode(self, codes: np.ndarray) -> pd.Categorical:
+        return pd.Categorical.from_codes(codes, dtype=self.dtype, validate=False)
+
+class RingBuffer:
+    """
+    Fixed-capacity, column-oriented ring buffer for time-indexed rows.
+
+    Every column (and the index) is backed by a NumPy array of twice the capacity.
+    Each row is written to both halves, so the most recent rows are always stored
+    contiguously and `view` can hand out slices without copying or re-ordering.
+
+    Text columns (categorical, string or object) are stored as integer codes into a
+    per-column `Vocabulary` and handed out as categoricals, so building a view never
+    converts Python strings.
+    """
+    NUMERIC_KINDS = 'biufcmM'
+
+    def __init__(self, capacity: int, vocabularies: dict = None):
+        """
+        :param capacity: The maximum number of rows kept in the buffer.
+        :param vocabularies: {column: Vocabulary} to share with other buffers that are appended
+                             the same rows (see `encode`). A private dict by default.
+        """
+        if capacity <= 0:
+            raise ValueError("RingBuffer capacity must be a positive integer.")
+        self.capacity = int(capacity)
+        self.columns = []
+        self.index_name = None
+        self._index = None
+        self._data = {}
+        self.vocabularies = {} if vocabularies is None else vocabularies
+        self._head = 0  # Slot (in [0, capacity)) the next row is written to
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        """Drops all rows and the column layout. Vocabularies are kept; their codes stay valid."""
+        self.columns = []
+        self.index_name = None
+        self._index = None
+        self._data = {}
+        self._head = 0
+        self._size = 0
+
+    @staticmethod
+    def columns_of(frame: pd.DataFrame) -> dict:
+        """
+        The column arrays of a DataFrame in the form `append_columns` takes: categoricals as
+        they are, everything else as NumPy arrays.
+        """
+        columns = {}
+        for column, values in frame.items():
+            columns[column] = values.array if isinstance(values.dtype, pd.CategoricalDtype) else values.to_numpy()
+        return columns
+
+    def encode(self, columns: dict) -> dict:
+        """
+        Returns `columns` (see `columns_of`) with the text columns replaced by their codes in
+        the buffer's vocabularies, which are created on first sight of a column. Encoded columns
+        can be appended to every buffer sharing the vocabularies with `encoded=True`.
+        """
+        encoded = {}
+        for column, values in columns.items():
+            if column not in self.vocabularies:
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    self.vocabularies[column] = Vocabulary(values.categories)
+                elif values.dtype.kind not in self.NUMERIC_KINDS:
+                    self.vocabularies[column] = Vocabulary()
+            encoded[column] = self.vocabularies[column].encode(values) if column in self.vocabularies else values
+        return encoded
+
+    def _allocate(self, index: np.ndarray, columns: dict):
+        self.columns = list(columns)
+        self._index = np.empty(2 * self.capacity, dtype=index.dtype)
+        self._data = {column: np.empty(2 * self.capacity, dtype=values.dtype) for column, values in columns.items()}
+
+    def _write(self, buffer: np.ndarray, values: np.ndarray) -> np.ndarray:
+        if not np.can_cast(values.dtype, buffer.dtype, casting='same_kind'):
+            # e.g. an int column that later receives NaNs; widen the buffer once.
+            buffer = buffer.astype(np.result_type(buffer.dtype, values.dtype))
+        slots = (self._head + np.arange(len(values))) % self.capacity
+        buffer[slots] = values
+        buffer[slots + self.capacity] = values
+        return buffer
+
+    def append(self, frame: pd.DataFrame):
+        """
+        Appends the rows of a DataFrame. Only the last `capacity` rows are kept.
+
+        :param frame: Rows to append; must have the same columns as earlier appends.
+        """
+        if frame.empty:
+            return
+        self.append_columns(frame.index.to_numpy(), self.columns_of(frame), frame.index.name)
+
+    def append_columns(self, index: np.ndarray, columns: dict, index_name=None, encoded: bool = False):
+        """
+        Appends rows given as an index array and a {column: array} dict (see `columns_of`).
+        Lets several buffers share one extraction of the same rows.
+
+        :param encoded: The text columns are already codes from `encode` on a buffer sharing
+                        this buffer's vocabularies.
+        """
+        if len(index) == 0:
+            return
+        rows = min(len(index), self.capacity)
+        index = index[-rows:]
+        columns = {column: values[-rows:] for column, values in columns.items()}
+        if not encoded:
+            columns = self.encode(columns)
+        self.index_name = index_name
+        if self._index is None:
+            self._allocate(index, columns)
+        elif list(columns) != self.columns:
+            raise ValueError(f"RingBuffer columns {self.columns} do not match appended columns {list(columns)}.")
+
+        self._index = self._write(self._index, index)
+        for column in self.columns:
+            self._data[column] = self._write(self._data[column], columns[column])
+
+        self._head = (self._head + rows) % self.capacity
+        self._size = min(self._size + rows, self.capacity)
+
+    def last_index(self):
+        """Returns the index value of the most recent row, or None if the buffer is empty."""
+        if self._size == 0:
+            return None
+        return self._index[(self._head - 1) % self.capacity]
+
+    def last_value(self, column: str):
+        """Returns the value of `column` in the most recent row, or None if the buffer is empty."""
+        if self._size == 0:
+            return None
+        value = self._data[column][(self._head - 1) % self.capacity]
+        if column in self.vocabularies:
+            return None if value < 0 else self.vocabularies[column].dtype.categories[value]
+        return value
+
+    def view(self, n: int = None, copy: bool = False) -> pd.DataFrame:
+        """
+        Returns the most recent rows, oldest first, as a DataFrame.
+
+        :param n: Number of rows to return. Defaults to every row in the buffer.
+        :param copy: Copy the rows out of the buffer. Without a copy the frame is backed by the
+                     buffer arrays and is overwritten by later appends, so it must not be kept.
+        """
+        if self._size == 0:
+            return pd.DataFrame()
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self.capacity
+        start = end - n
+        index = self._index[start:end]
+        data = {}
+        for column in self.columns:
+            values = self._data[column][start:end]
+            if copy:
+                values = values.copy()
+            if column in self.vocabularies:
+                values = self.vocabularies[column].decode(values)
+            data[column] = values
+        return pd.DataFrame(data, index=pd.Index(index.copy() if copy else index, name=self.index_name, copy=False), copy=False)
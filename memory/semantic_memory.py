@@ -1,39 +1,453 @@
-import faiss
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import time
 import numpy as np
-from sentence_transformers import SentenceTransformer
+import pandas as pd
+
+class LazyTexts:
+    """
+    Sequence of entry texts backed by a memory-mapped UTF-8 blob and an offsets array. Texts
+    are decoded only when accessed; texts added after loading are kept in a plain list.
+    """
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+        self._stored = len(offsets) - 1
+        self._extra = []
+
+    def __len__(self):
+        return self._stored + len(self._extra)
+
+    def __getitem__(self, i):
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        if i >= self._stored:
+            return self._extra[i - self._stored]
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def extend(self, texts):
+        self._extra.extend(texts)
 
 class SemanticMemory:
-    def __init__(self, dimension=384):
+    MODEL_NAME = 'all-MiniLM-L6-v2'
+    INDEX_TYPES = ('flat', 'ivf', 'hnsw')
+    NO_TIMESTAMP = np.iinfo(np.int64).min  # Entries without a timestamp are visible at any time
+    NO_TICKER = -1  # Entries without a ticker are visible to every ticker
+
+    def __init__(self, dimension=384, batch_size=None, embedding_store=None, cache_size=256,
+                 index_type='flat', promote_threshold=50000, nprobe=16, hnsw_m=32):
+        """
+        :param dimension: Embedding dimension of the sentence transformer.
+        :param batch_size: Texts encoded per model call. Defaults to a size scaled to the CPU count.
+        :param embedding_store: Optional EmbeddingStore of precomputed vectors. Texts found in it
+                                are never passed to the model, which is only loaded on a miss.
+        :param cache_size: Entries kept in each of the query-embedding and search-result LRU caches.
+        :param index_type: 'flat', 'ivf' or 'hnsw'. Memory always starts on an exact flat index and
+                           is promoted to this type once it holds `promote_threshold` entries.
+        :param promote_threshold: Entry count at which the flat index is rebuilt as `index_type`.
+        :param nprobe: IVF lists visited per search.
+        :param hnsw_m: Neighbours per node in the HNSW graph.
+        """
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"Invalid index type '{index_type}'. Choose one of {self.INDEX_TYPES}.")
         self.dimension = dimension
-        self.index = faiss.IndexFlatL2(dimension)
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.batch_size = batch_size or max(16, 8 * (os.cpu_count() or 1))
+        self.index_type = index_type
+        self.promote_threshold = promote_threshold
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self._index = None
+        self.active_index_type = 'flat'
+        self.embedding_store = embedding_store
+        if embedding_store is not None and embedding_store.model_name != self.MODEL_NAME:
+            print(f"Warning: Embedding store was built with {embedding_store.model_name}, not {self.MODEL_NAME}. Ignoring it.")
+            self.embedding_store = None
+        self._model = None
         self.entries = []
+        self._hashes = set()
+        self._pending = []
+        self.read_only = False
+
+        # Per-vector metadata, indexed by FAISS id, used to filter searches inside the index.
+        self.timestamps = np.empty(0, dtype='int64')
+        self.ticker_codes = np.empty(0, dtype='int32')
+        self.ticker_ids = {}
+        self._max_timestamp = self.NO_TIMESTAMP
+
+        # `version` changes whenever the index does; cached search results are only valid for
+        # the version they were computed at.
+        self.version = 0
+        self.cache_size = cache_size
+        self._query_cache = OrderedDict()
+        self._search_cache = OrderedDict()
+        self.cache_counters = {'query_hits': 0, 'query_misses': 0, 'search_hits': 0, 'search_misses': 0}
+
+        # Agents vote from debate threads while the main thread queues news, so adding, flushing,
+        # searching and the LRU caches are serialized. Reentrant because searches flush the queue.
+        self._lock = threading.RLock()
+
+    @property
+    def model(self):
+        # sentence_transformers (and torch) are only imported once something actually needs encoding.
+        if self._model is None:
+            start = time.perf_counter()
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.MODEL_NAME)
+            print(f"Loaded embedding model {self.MODEL_NAME} in {time.perf_counter() - start:.2f}s")
+        return self._model
+
+    @property
+    def index(self):
+        if self._index is None:
+            import faiss
+            self._index = faiss.IndexFlatL2(self.dimension)
+        return self._index
+
+    @index.setter
+    def index(self, index):
+        self._index = index
+
+    @staticmethod
+    def _hash(text: str, ticker=None) -> str:
+        return hashlib.sha1(f"{ticker}\0{text}".encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _timestamp_value(cls, timestamp) -> int:
+        if timestamp is None or pd.isna(timestamp):
+            return cls.NO_TIMESTAMP
+        return pd.Timestamp(timestamp).value
+
+    def _ticker_code(self, ticker, create: bool = False) -> int:
+        if ticker is None:
+            return self.NO_TICKER
+        if create and ticker not in self.ticker_ids:
+            self.ticker_ids[ticker] = len(self.ticker_ids)
+        return self.ticker_ids.get(ticker, self.NO_TICKER - 1)
+
+    def _encode(self, texts: list) -> np.ndarray:
+        """
+        Embeds texts, taking vectors from the embedding store where possible and encoding only
+        the remaining texts with the model, in batches.
+        """
+        if self.embedding_store is not None:
+            embeddings, missing = self.embedding_store.lookup(texts)
+        else:
+            embeddings, missing = None, list(range(len(texts)))
+        if not missing:
+            return embeddings
+
+        missing_texts = [texts[i] for i in missing]
+        encoded = np.vstack([
+            self.model.encode(missing_texts[start:start + self.batch_size], batch_size=self.batch_size)
+            for start in range(0, len(missing_texts), self.batch_size)
+        ])
+        if embeddings is None or encoded.shape[1] != embeddings.shape[1]:
+            return encoded
+        embeddings[missing] = encoded
+        return embeddings
+
+    def add_memory(self, text: str, timestamp=None, ticker=None):
+        self.add_memories([text], [timestamp], [ticker])
+
+    def add_memories(self, texts: list, timestamps: list = None, tickers: list = None) -> int:
+        """
+        Embeds and indexes several texts at once. Texts that are already in memory for the same
+        ticker (or repeated within `texts`) are skipped; the rest are encoded in batches and
+        added to the index in a single call.
+
+        :param texts: Texts to add.
+        :param timestamps: When each text became known; searches with `as_of` only see texts
+                           from that time or earlier. None means always visible.
+        :param tickers: The ticker each text is about. None means relevant to every ticker.
+        :return: The number of texts actually added.
+        """
+        with self._lock:
+            if self.read_only:
+                raise RuntimeError("This SemanticMemory was loaded read-only; new memories cannot be added.")
+            if self._hashes is None:
+                self._hashes = set(self._load_hashes())
+            timestamps = timestamps or [None] * len(texts)
+            tickers = tickers or [None] * len(texts)
+            new_rows = []
+            new_hashes = []
+            seen = set()
+            for text, timestamp, ticker in zip(texts, timestamps, tickers):
+                text_hash = self._hash(text, ticker)
+                if text_hash in self._hashes or text_hash in seen:
+                    continue
+                seen.add(text_hash)
+                new_rows.append((text, timestamp, ticker))
+                new_hashes.append(text_hash)
+            if not new_rows:
+                return 0
+
+            new_texts = [text for text, _, _ in new_rows]
+            embeddings = self._encode(new_texts)
+            if embeddings.shape[1] != self.dimension:
+                print(f"Warning: Embedding dimension mismatch on add. Expected {self.dimension}, got {embeddings.shape[1]}. Skipping memory.")
+                return 0
+            self.index.add(np.ascontiguousarray(embeddings, dtype='float32'))
+            self.entries.extend(new_texts)
+            self._hashes.update(new_hashes)
+
+            new_timestamps = np.array([self._timestamp_value(timestamp) for _, timestamp, _ in new_rows], dtype='int64')
+            self.timestamps = np.concatenate([self.timestamps, new_timestamps])
+            self.ticker_codes = np.concatenate([
+                self.ticker_codes,
+                np.array([self._ticker_code(ticker, create=True) for _, _, ticker in new_rows], dtype='int32')
+            ])
+            self._max_timestamp = max(self._max_timestamp, int(new_timestamps.max()))
+            self.version += 1
+
+            if self.active_index_type == 'flat' and self.index_type != 'flat' and len(self.entries) >= self.promote_threshold:
+                self._promote_index()
+            return len(new_rows)
+
+    def _promote_index(self):
+        """Rebuilds the exact flat index as the configured approximate index type."""
+        import faiss
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        if self.index_type == 'ivf':
+            nlist = max(1, int(4 * np.sqrt(len(vectors))))
+            quantizer = faiss.IndexFlatL2(self.dimension)
+            index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist)
+            index.train(vectors)
+            self._quantizer = quantizer  # The IVF index does not own its quantizer
+        else:
+            index = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m)
+        index.add(vectors)
+        print(f"Semantic memory promoted from a flat index to {self.index_type} at {len(vectors)} entries.")
+        self.index = index
+        self.active_index_type = self.index_type
+
+    def queue_memory(self, text: str, timestamp=None, ticker=None):
+        """
+        Queues a text for embedding instead of encoding it immediately. The queue is flushed
+        when it reaches `batch_size` and before every search, so searches always see it.
+        """
+        with self._lock:
+            self._pending.append((text, timestamp, ticker))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Embeds and indexes all queued texts."""
+        with self._lock:
+            if self._pending:
+                pending, self._pending = self._pending, []
+                texts, timestamps, tickers = (list(column) for column in zip(*pending))
+                self.add_memories(texts, timestamps, tickers)
+
+    def _cache_get(self, cache: OrderedDict, key, counter: str):
+        if key in cache:
+            cache.move_to_end(key)
+            self.cache_counters[f'{counter}_hits'] += 1
+            return cache[key]
+        self.cache_counters[f'{counter}_misses'] += 1
+        return None
+
+    def _cache_put(self, cache: OrderedDict, key, value):
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def _query_embedding(self, query_text: str) -> np.ndarray:
+        embedding = self._cache_get(self._query_cache, query_text, 'query')
+        if embedding is None:
+            embedding = np.array(self._encode([query_text]), dtype='float32')
+            self._cache_put(self._query_cache, query_text, embedding)
+        return embedding
+
+    def _visible_mask(self, as_of, ticker):
+        """Boolean mask of the entries visible at `as_of` (a timestamp value) to `ticker`; None if unfiltered."""
+        mask = None
+        if as_of is not None:
+            mask = np.asarray(self.timestamps) <= as_of
+        if ticker is not None:
+            codes = np.asarray(self.ticker_codes)
+            ticker_mask = (codes == self._ticker_code(ticker)) | (codes == self.NO_TICKER)
+            mask = ticker_mask if mask is None else mask & ticker_mask
+        return mask
+
+    def _search_filter(self, mask):
+        """
+        Builds FAISS search parameters whose ID selector only admits the entries in `mask`, so
+        the filter is applied while the index is scanned rather than afterwards.
+
+        :return: (params, bits). Both are None if every entry is visible. The bitmap is returned
+                 so it outlives the search.
+        """
+        if mask is None or mask.all():
+            return None, None
+
+        import faiss
+        bits = np.packbits(mask, bitorder='little')
+        selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits))
+        if self.active_index_type == 'ivf':
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=self.nprobe)
+        elif self.active_index_type == 'hnsw':
+            params = faiss.SearchParametersHNSW(sel=selector)
+        else:
+            params = faiss.SearchParameters(sel=selector)
+        return params, bits
+
+    def visible_count(self, ticker=None, as_of=None) -> int:
+        """
+        Number of entries a search with the same `ticker` and `as_of` filters could return. It only
+        changes when memories relevant to that search are added, which makes it a cheap signal
+        for whether anything new could be found.
+        """
+        with self._lock:
+            self.flush()
+            mask = self._visible_mask(None if as_of is None else self._timestamp_value(as_of), ticker)
+            return len(self.timestamps) if mask is None else int(mask.sum())
+
+    def search_memory(self, query_text: str, k: int = 5, as_of=None, ticker=None) -> list:
+        """
+        Returns up to `k` entries closest to `query_text`.
+
+        :param as_of: Only entries with a timestamp at or before this time are returned.
+        :param ticker: Only entries about this ticker (or about no ticker in particular) are returned.
+        """
+        with self._lock:
+            self.flush()
+            if not len(self.entries):
+                return []  # Nothing to search; avoids loading the model for the query
+            as_of = None if as_of is None else self._timestamp_value(as_of)
+            if as_of is not None and as_of >= self._max_timestamp:
+                as_of = None  # Every entry is already visible; skip the timestamp filter
+
+            # Entries become visible in timestamp order, so for a ticker the number of visible
+            # entries identifies the visible set. Keying on it rather than on `as_of` lets every
+            # bar between two news items share a cache entry, including on a prebuilt store.
+            mask = self._visible_mask(as_of, ticker)
+            visible = len(self.timestamps) if mask is None else int(mask.sum())
+            cache_key = (query_text, k, self.version, ticker, visible)
+            cached = self._cache_get(self._search_cache, cache_key, 'search')
+            if cached is not None:
+                return list(cached)
+
+            query_embedding = self._query_embedding(query_text)
+            if query_embedding.shape[1] != self.dimension:
+                print(f"Warning: Embedding dimension mismatch on search. Expected {self.dimension}, got {query_embedding.shape[1]}. Skipping search.")
+                return []
+
+            results = []
+            params, bits = self._search_filter(mask)
+            if bits is None or bits.any():
+                if self.active_index_type == 'ivf':
+                    self.index.nprobe = self.nprobe
+                distances, indices = self.index.search(query_embedding, k, params=params)
+
+                for i in range(len(indices[0])):
+                    idx = indices[0][i]
+                    if idx != -1:
+                        results.append({
+                            'text': self.entries[idx],
+                            'distance': distances[0][i]
+                        })
+            self._cache_put(self._search_cache, cache_key, results)
+            return list(results)
+
+    def save(self, directory: str):
+        """
+        Writes the index, entry texts and per-entry metadata to `directory` so the memory can be
+        reloaded with `load` without re-embedding anything.
+        """
+        with self._lock:
+            import faiss
+            self.flush()
+            os.makedirs(directory, exist_ok=True)
+            faiss.write_index(self.index, os.path.join(directory, 'index.faiss'))
+
+            encoded = [text.encode('utf-8') for text in self.entries]
+            offsets = np.zeros(len(encoded) + 1, dtype='int64')
+            offsets[1:] = np.cumsum([len(text) for text in encoded])
+            with open(os.path.join(directory, 'texts.bin'), 'wb') as f:
+                f.write(b''.join(encoded))
+            np.save(os.path.join(directory, 'text_offsets.npy'), offsets)
+            np.save(os.path.join(directory, 'timestamps.npy'), np.asarray(self.timestamps))
+            np.save(os.path.join(directory, 'ticker_codes.npy'), np.asarray(self.ticker_codes))
+            with open(os.path.join(directory, 'meta.json'), 'w') as f:
+                json.dump({
+                    'model': self.MODEL_NAME,
+                    'dimension': self.dimension,
+                    'count': len(self.entries),
+                    'index_type': self.index_type,
+                    'active_index_type': self.active_index_type,
+                    'promote_threshold': self.promote_threshold,
+                    'ticker_ids': self.ticker_ids
+                }, f)
+            print(f"Semantic memory with {len(self.entries)} entries saved to {directory}")
+
+    @classmethod
+    def load(cls, directory: str, read_only: bool = True, **kwargs):
+        """
+        Loads a memory written by `save`. Texts are decoded lazily and, when `read_only`, the
+        index is memory-mapped where FAISS supports it, so a warm start does not depend on the
+        number of entries.
+
+        :param read_only: Share the store without modifying it; `add_memories` then raises.
+                          Otherwise the index is read into memory, since a memory-mapped IVF
+                          index cannot be added to.
+        :param kwargs: Other constructor arguments (e.g. `embedding_store`, `cache_size`).
+        """
+        import faiss
+        with open(os.path.join(directory, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        memory = cls(
+            dimension=meta['dimension'],
+            index_type=meta['index_type'],
+            promote_threshold=meta['promote_threshold'],
+            **kwargs
+        )
+
+        index_path = os.path.join(directory, 'index.faiss')
+        if read_only:
+            try:
+                memory.index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                # Not every index type can be memory-mapped; fall back to reading it into memory.
+                memory.index = faiss.read_index(index_path)
+        else:
+            memory.index = faiss.read_index(index_path)
+        memory.active_index_type = meta['active_index_type']
+
+        blob = np.memmap(os.path.join(directory, 'texts.bin'), dtype='uint8', mode='r') if meta['count'] else np.zeros(0, dtype='uint8')
+        memory.entries = LazyTexts(blob, np.load(os.path.join(directory, 'text_offsets.npy'), mmap_mode='r'))
+        memory.timestamps = np.load(os.path.join(directory, 'timestamps.npy'), mmap_mode='r')
+        memory.ticker_codes = np.load(os.path.join(directory, 'ticker_codes.npy'), mmap_mode='r')
+        memory.ticker_ids = meta['ticker_ids']
+        memory._max_timestamp = int(memory.timestamps.max()) if meta['count'] else cls.NO_TIMESTAMP
+        memory._hashes = None  # Rebuilt from the texts on the first add
+        memory.read_only = read_only
+        return memory
+
+    def _load_hashes(self):
+        codes_to_tickers = {code: ticker for ticker, code in self.ticker_ids.items()}
+        for text, code in zip(self.entries, self.ticker_codes):
+            yield self._hash(text, codes_to_tickers.get(int(code)))
+
+    def merge_cache_counters(self, counters: dict):
+        """Adds the cache counters of another memory, e.g. one used in a worker process."""
+        with self._lock:
+            for name, count in counters.items():
+                self.cache_counters[name] += count
 
-    def add_memory(self, text: str):
-        embedding = self.model.encode([text])
-        if embedding.shape[1] != self.dimension:
-            print(f"Warning: Embedding dimension mismatch on add. Expected {self.dimension}, got {embedding.shape[1]}. Skipping memory.")
-            return
-        self.index.add(np.array(embedding, dtype='float32'))
-        self.entries.append(text)
-
-    def search_memory(self, query_text: str, k: int = 5) -> list:
-        query_embedding = self.model.encode([query_text])
-        if query_embedding.shape[1] != self.dimension:
-            print(f"Warning: Embedding dimension mismatch on search. Expected {self.dimension}, got {query_embedding.shape[1]}. Skipping search.")
-            return []
-            
-        distances, indices = self.index.search(np.array(query_embedding, dtype='float32'), k)
-        
-        results = []
-        for i in range(len(indices[0])):
-            idx = indices[0][i]
-            if idx != -1:
-                results.append({
-                    'text': self.entries[idx],
-                    'distance': distances[0][i]
-                })
-        return results
+    def cache_report(self) -> str:
+        counters = self.cache_counters
+        return (
+            f"Semantic memory caches: query embeddings {counters['query_hits']} hits / {counters['query_misses']} misses, "
+            f"search results {counters['search_hits']} hits / {counters['search_misses']} misses"
+        )
 
 if __name__ == '__main__':
     semantic_memory = SemanticMemory()
@@ -42,4 +456,4 @@ if __name__ == '__main__':
     semantic_memory.add_memory("Central bank announces interest rate hike.")
 
     search_results = semantic_memory.search_memory("What is the latest news on interest rates?")
-    print(search_results) 
\ No newline at end of file
+    print(search_results)
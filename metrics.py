@@ -0,0 +1,156 @@
+import math
+from collections import deque
+
+class MetricsAccumulator:
+    """
+    Performance metrics of one portfolio, updated in O(1) per decision step so they are
+    available while a backtest runs and at its end without re-scanning the value history.
+
+    Tracks the running mean and variance of step returns (Welford), the running peak and
+    drawdown, turnover, a rolling-window Sharpe ratio and a buy-and-hold benchmark bought with
+    the same initial capital at `benchmark_price`.
+    """
+    def __init__(self, initial_value: float = 10000, benchmark_price: float = None,
+                 periods_per_year: float = 252, rolling_window: int = 12):
+        """
+        :param benchmark_price: Price at which the buy-and-hold benchmark buys.
+        :param periods_per_year: Decision steps per year, used to annualize the Sharpe ratios.
+        :param rolling_window: Number of step returns in the rolling Sharpe ratio.
+        """
+        self.initial_value = initial_value
+        self.periods_per_year = periods_per_year
+        self.rolling_window = rolling_window
+        self.benchmark_start = benchmark_price
+        self.benchmark_price = benchmark_price
+        self.steps = 0
+        self.value = math.nan
+        # Welford state of the step returns
+        self.returns = 0
+        self.mean_return = 0.0
+        self._m2 = 0.0
+        self.peak = -math.inf
+        self.max_drawdown = 0.0
+        self.traded = 0.0
+        self._value_sum = 0.0
+        self._window = deque(maxlen=rolling_window)
+        self._window_sum = 0.0
+        self._window_sum_sq = 0.0
+
+    def update(self, value: float, price: float = None, traded: float = 0.0):
+        """
+        Records the portfolio value after a decision step.
+
+        :param price: The asset price at the step, which values the benchmark.
+        :param traded: Absolute amount bought or sold at the step.
+        """
+        if self.steps:
+            step_return = value / self.value - 1
+            self.returns += 1
+            delta = step_return - self.mean_return
+            self.mean_return += delta / self.returns
+            self._m2 += delta * (step_return - self.mean_return)
+            if len(self._window) == self._window.maxlen:
+                old = self._window[0]
+                self._window_sum -= old
+                self._window_sum_sq -= old * old
+            self._window.append(step_return)
+            self._window_sum += step_return
+            self._window_sum_sq += step_return * step_return
+
+        self.steps += 1
+        self.value = value
+        self.peak = max(self.peak, value)
+        self.max_drawdown = min(self.max_drawdown, self.drawdown)
+        self.traded += abs(traded)
+        self._value_sum += value
+        if price is not None:
+            if self.benchmark_start is None:
+                self.benchmark_start = price
+            self.benchmark_price = price
+
+    def mark_benchmark(self, price: float):
+        """Values the benchmark at `price` without a decision step, e.g. at the last bar of the data."""
+        self.benchmark_price = price
+
+    @property
+    def drawdown(self) -> float:
+        return self.value / self.peak - 1 if self.steps else 0.0
+
+    @property
+    def total_return(self) -> float:
+        return self.value / self.initial_value - 1 if self.steps else 0.0
+
+    @property
+    def volatility(self) -> float:
+        return math.sqrt(self._m2 / (self.returns - 1)) if self.returns > 1 else 0.0
+
+    def _annualized_sharpe(self, mean: float, std: float) -> float:
+        # Treat a standard deviation that is only rounding noise as zero
+        if std <= 1e-12 * max(1.0, abs(mean)):
+            return 0.0
+        return math.sqrt(self.periods_per_year) * mean / std
+
+    @property
+    def sharpe(self) -> float:
+        return self._annualized_sharpe(self.mean_return, self.volatility)
+
+    @property
+    def sharpe_definition(self) -> str:
+        """How the Sharpe ratios are computed, for labelling reports."""
+        return (f"mean / std of per-decision returns x sqrt({self.periods_per_year:g} decisions per year), "
+                f"no risk-free rate")
+
+    @property
+    def rolling_sharpe(self) -> float:
+        """Sharpe ratio over the last `rolling_window` step returns; NaN until the window is full."""
+        count = len(self._window)
+        if count < self._window.maxlen or count < 2:
+            return math.nan
+        mean = self._window_sum / count
+        variance = max(0.0, (self._window_sum_sq - count * mean * mean) / (count - 1))
+        return self._annualized_sharpe(mean, math.sqrt(variance))
+
+    @property
+    def turnover(self) -> float:
+        """Total amount traded as a multiple of the average portfolio value."""
+        return self.traded / (self._value_sum / self.steps) if self.steps else 0.0
+
+    @property
+    def benchmark_value(self) -> float:
+        if self.benchmark_start is None:
+            return self.initial_value
+        return self.initial_value * self.benchmark_price / self.benchmark_start
+
+    @property
+    def benchmark_return(self) -> float:
+        return self.benchmark_value / self.initial_value - 1
+
+    def summary(self) -> dict:
+        return {
+            'final_value': self.value,
+            'return': self.total_return,
+            'buy_and_hold_value': self.benchmark_value,
+            'buy_and_hold_return': self.benchmark_return,
+            'sharpe': self.sharpe,
+            'rolling_sharpe': self.rolling_sharpe,
+            'max_drawdown': self.max_drawdown,
+            'turnover': self.turnover,
+            'steps': self.steps
+        }
+
+    def format(self) -> str:
+        return (f"value ${self.value:,.2f} ({self.total_return:+.2%}, buy & hold {self.benchmark_return:+.2%}), "
+                f"Sharpe {self.sharpe:.2f} (rolling {self.rolling_sharpe:.2f}), "
+                f"drawdown {self.drawdown:.2%} (max {self.max_drawdown:.2%}), turnover {self.turnover:.2f}")
+
+if __name__ == '__main__':
+    import numpy as np
+    rng = np.random.default_rng(0)
+    values = 10000 * np.cumprod(1 + rng.normal(0.001, 0.02, 500))
+    accumulator = MetricsAccumulator(periods_per_year=252, rolling_window=20)
+    for value in values:
+        accumulator.update(value, price=value)
+    returns = values[1:] / values[:-1] - 1
+    print(accumulator.format())
+    print(f"Batch Sharpe {np.sqrt(252) * returns.mean() / returns.std(ddof=1):.4f}, "
+          f"accumulated {accumulator.sharpe:.4f}")
@@ -0,0 +1,108 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+def lttb(x, y, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling. Returns the indices of `threshold` points that
+    keep the visual shape of the series: the first and last points, and from each bucket in
+    between the point forming the largest triangle with the previously kept point and the mean
+    of the next bucket, so peaks and troughs survive.
+
+    :param x: Increasing numeric x values (e.g. timestamps as integers).
+    :param y: The y values.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Buckets over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = np.nanmean(y[next_start:next_end]) if np.isfinite(y[next_start:next_end]).any() else y[previous]
+        # Twice the triangle areas; the constant factor does not change the argmax
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.nanargmax(areas)) if np.isfinite(areas).any() else start
+        indices[bucket + 1] = previous
+    return indices
+
+def downsample(times, values, max_points: int):
+    """Downsamples a time series to at most `max_points` points with LTTB; `None` keeps every point."""
+    times = np.asarray(times)
+    values = np.asarray(values, dtype='float64')
+    if max_points is None or len(values) <= max_points:
+        return times, values
+    x = times.astype('datetime64[ns]').astype(np.int64) if np.issubdtype(times.dtype, np.datetime64) else times
+    keep = lttb(x, values, max_points)
+    return times[keep], values[keep]
+
+def plot_decision_distribution(decision_counts: dict, path: str):
+    """Pie chart of how often each decision was made."""
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(8, 6))
+    plt.pie(list(decision_counts.values()), labels=list(decision_counts), autopct='%1.1f%%', colors=['skyblue', 'salmon', 'lightgrey'])
+    plt.title('Trade Decision Distribution (BUY/SELL/HOLD)')
+    plt.savefig(path)
+    plt.close()
+    return path
+
+def plot_series(series: list, title: str, path: str, figsize=(14, 8)):
+    """
+    Line chart of several time series.
+
+    :param series: (label, times, values, linestyle) tuples.
+    """
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=figsize)
+    for label, times, values, linestyle in series:
+        plt.plot(times, values, label=label, linestyle=linestyle)
+    plt.title(title)
+    plt.xlabel('Time')
+    plt.ylabel('Portfolio Value ($)')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(path)
+    plt.close()
+    return path
+
+def _render(function, args: tuple):
+    import matplotlib
+    matplotlib.use('Agg')  # Headless; workers never open a display
+    return function(*args)
+
+def start_rendering(jobs: list, workers: int = 1):
+    """
+    Starts rendering charts and returns a function that waits for them and returns their paths.
+    With more than one worker the charts render in a process pool while the caller carries on.
+
+    :param jobs: (plot function, args) tuples; the functions must be importable by the workers.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        return lambda: [_render(function, args) for function, args in jobs]
+
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=multiprocessing.get_context('spawn'))
+    futures = [executor.submit(_render, function, args) for function, args in jobs]
+
+    def wait():
+        try:
+            return [future.result() for future in futures]
+        finally:
+            executor.shutdown()
+    return wait
+
+if __name__ == '__main__':
+    import time
+    rng = np.random.default_rng(0)
+    values = 10000 * np.cumprod(1 + rng.normal(0, 0.001, 1_000_000))
+    start = time.perf_counter()
+    keep = lttb(np.arange(len(values)), values, 2000)
+    print(f"LTTB kept {len(keep)} of {len(values)} points in {time.perf_counter() - start:.2f}s; "
+          f"range {values.min():.2f}-{values.max():.2f}, kept range {values[keep].min():.2f}-{values[keep].max():.2f}")
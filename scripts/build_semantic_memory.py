@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import pandas as pd
+import yaml
+from memory.embedding_store import EmbeddingStore
+from memory.semantic_memory import SemanticMemory
+
+def decision_bars(data: pd.DataFrame, decision_interval: int) -> pd.DataFrame:
+    """
+    The rows whose news a backtest of `data` queues into semantic memory: within each ticker,
+    the bar before every `decision_interval`-th step (see `Trader._decision_steps`).
+    """
+    data = data.sort_values(['ticker', 'time'], kind='stable')
+    grouped = data.groupby('ticker', sort=False, observed=True)
+    step = grouped.cumcount() + 1
+    return data[(step % decision_interval == 0) & (step < grouped['time'].transform('size'))]
+
+def build_semantic_memory(data_path='historical_data_with_news.csv', output_dir='.cache/semantic_memory',
+                          embedding_store=None, index_type='flat', promote_threshold=50000,
+                          decision_interval=None, start=None):
+    """
+    Adds the dataset's news summaries to a SemanticMemory, tagged with their date and ticker,
+    and saves it to `output_dir`. Point `semantic_memory.store` at the directory to have backtests
+    load it read-only instead of embedding news as they go; searches still only see news up to
+    the current bar.
+
+    A backtest only queues the news of the bars it decides on, so by default the store holds the
+    same bars as a backtest whose data starts at `start`. Backtests over a period starting
+    elsewhere (walk-forward windows, `trade_start`) decide on other bars and so see different news
+    than they would without the store.
+
+    :param decision_interval: Bars between decisions, as in `backtest.decision_interval`. None
+                              indexes the news of every bar.
+    :param start: First bar of the backtest period; earlier rows are left out.
+    """
+    print(f"Loading news summaries from {data_path}...")
+    news = pd.read_csv(data_path, usecols=['time', 'ticker', 'news_summary'], parse_dates=['time'])
+    if start is not None:
+        news = news[news['time'] >= pd.to_datetime(start)]
+    if decision_interval is not None:
+        news = decision_bars(news, decision_interval)
+    news = news.dropna(subset=['news_summary'])
+    news = news[news['news_summary'] != 'No significant news']
+
+    memory = SemanticMemory(
+        embedding_store=EmbeddingStore.open(embedding_store),
+        index_type=index_type,
+        promote_threshold=promote_threshold
+    )
+    added = memory.add_memories(news['news_summary'].tolist(), news['time'].tolist(), news['ticker'].tolist())
+    print(f"Added {added} unique news items.")
+    memory.save(output_dir)
+    return memory
+
+if __name__ == "__main__":
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+    semantic_config = config.get('semantic_memory', {})
+
+    parser = argparse.ArgumentParser(description="Build a persistent SemanticMemory from the news dataset.")
+    parser.add_argument('--data-path', default=config['backtest'].get('news_data_path', 'historical_data_with_news.csv'))
+    parser.add_argument('--output-dir', default=semantic_config.get('store') or '.cache/semantic_memory')
+    parser.add_argument('--mode', choices=['train', 'test', 'all'], default='all',
+                        help="Backtest period whose decision bars are indexed.")
+    parser.add_argument('--every-bar', action='store_true',
+                        help="Index the news of every bar, not only the bars a backtest decides on.")
+    args = parser.parse_args()
+
+    period = config['backtest'].get(f"{args.mode}ing_period") if args.mode != 'all' else None
+
+    build_semantic_memory(
+        args.data_path, args.output_dir,
+        embedding_store=semantic_config.get('embedding_store'),
+        index_type=semantic_config.get('index_type', 'flat'),
+        promote_threshold=semantic_config.get('promote_threshold', 50000),
+        decision_interval=None if args.every_bar else config['backtest'].get('decision_interval', 5),
+        start=period['start'] if period else None
+    )
@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import yaml
+from llm.client import LLMClient
+
+def run_load_test(client: LLMClient, requests_count: int, threads: int):
+    """
+    Fires `requests_count` distinct prompts at the client from `threads` threads and prints the
+    achieved throughput and the client's latency stats.
+    """
+    prompts = [f"Load test prompt {i}. Provide your answer as 'VOTE: [BUY/SELL/HOLD], CONFIDENCE: [0.0-1.0]'." for i in range(requests_count)]
+
+    def ask(prompt):
+        try:
+            client.generate(client.default_model, prompt)
+        except Exception as e:
+            print(f"Request failed: {e}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(ask, prompts))
+    elapsed = time.perf_counter() - start
+
+    print(f"{requests_count} requests in {elapsed:.2f}s ({requests_count / elapsed:.1f} req/s)")
+    print(client.report())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the shared LLM client, e.g. against scripts/llm_stub_server.py.")
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--base-url', default=None, help="Overrides llm.base_url and forces the http backend.")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        llm_config = yaml.safe_load(f).get('llm', {})
+    if args.base_url:
+        llm_config.update({'backend': 'http', 'base_url': args.base_url})
+
+    run_load_test(LLMClient.from_config(llm_config), args.requests, args.threads)
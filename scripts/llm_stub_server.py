@@ -0,0 +1,72 @@
+import argparse
+import hashlib
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def stub_answer(prompt: str) -> str:
+    """
+    Returns a deterministic answer in the format the agents parse. Batched prompts
+    ('### ITEM n' sections) get one 'ITEM n: VOTE: ..., CONFIDENCE: ...' line per item.
+    """
+    rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+    items = len(re.findall(r"^### ITEM \d+", prompt, re.MULTILINE))
+    votes = [f"VOTE: {rng.choice(['BUY', 'SELL', 'HOLD'])}, CONFIDENCE: {rng.uniform(0.3, 0.9):.2f}" for _ in range(max(items, 1))]
+    if not items:
+        return votes[0]
+    return "\n".join(f"ITEM {number}: {vote}" for number, vote in enumerate(votes, start=1))
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers Gemini-style `generateContent` POSTs with the same response shape."""
+    latency = 0.0
+    error_rate = 0.0
+
+    def do_POST(self):
+        if not self.path.split('?')[0].endswith(':generateContent'):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        prompt = ''.join(part.get('text', '') for content in body.get('contents', []) for part in content.get('parts', []))
+
+        time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            self.send_error(429, "Resource has been exhausted (stub)")
+            return
+
+        payload = json.dumps({
+            'candidates': [{
+                'content': {'role': 'model', 'parts': [{'text': stub_answer(prompt)}]},
+                'finishReason': 'STOP'
+            }]
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(host='127.0.0.1', port=8765, latency=0.0, error_rate=0.0):
+    StubHandler.latency = latency
+    StubHandler.error_rate = error_rate
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    print(f"LLM stub server listening on http://{host}:{port} (latency {latency}s, error rate {error_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini generateContent API. Point `llm.backend: http` at it.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to wait before answering each request.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with HTTP 429.")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.latency, args.error_rate)
@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import pandas as pd
+import yaml
+from sentence_transformers import SentenceTransformer
+from memory.embedding_store import EmbeddingStore
+from memory.semantic_memory import SemanticMemory
+from agents.long_agent import LongTermAgent
+
+def precompute_embeddings(data_path='historical_data_with_news.csv', output_dir='.cache/embeddings', batch_size=256):
+    """
+    Embeds every unique news summary in the dataset (plus the agents' fixed search queries) once
+    and writes them to an EmbeddingStore, so backtests never have to load the transformer model.
+    """
+    print(f"Loading news summaries from {data_path}...")
+    summaries = pd.read_csv(data_path, usecols=['news_summary'])['news_summary'].dropna()
+    summaries = summaries[summaries != 'No significant news'].unique().tolist()
+    texts = summaries + [LongTermAgent.SEMANTIC_QUERY]
+    print(f"Embedding {len(texts)} unique texts with {SemanticMemory.MODEL_NAME}...")
+
+    model = SentenceTransformer(SemanticMemory.MODEL_NAME)
+    store = EmbeddingStore.build(texts, model, SemanticMemory.MODEL_NAME, output_dir, batch_size=batch_size)
+    print(f"Embedding store with {len(store)} vectors saved to {output_dir}")
+    return store
+
+if __name__ == "__main__":
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    parser = argparse.ArgumentParser(description="Precompute news embeddings for SemanticMemory.")
+    parser.add_argument('--data-path', default=config['backtest'].get('news_data_path', 'historical_data_with_news.csv'))
+    parser.add_argument('--output-dir', default=config.get('semantic_memory', {}).get('embedding_store', '.cache/embeddings'))
+    parser.add_argument('--batch-size', type=int, default=256)
+    args = parser.parse_args()
+
+    precompute_embeddings(args.data_path, args.output_dir, args.batch_size)
@@ -0,0 +1,133 @@
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+import yaml
+
+DECISION_CODES = {'SELL': -1, 'HOLD': 0, 'BUY': 1}
+POLICIES = ('proportional', 'fixed', 'all_in', 'scaled')
+
+def make_variants(policies=('proportional',), thresholds=(0.6,), fractions=(0.5,), cost_bps=(0.0,)) -> pd.DataFrame:
+    """
+    Builds the grid of execution variants to simulate.
+
+    Sizing policies decide the fraction of cash to invest on BUY, and of shares to sell on SELL:
+    - 'proportional': the debate's confidence (what Trader does).
+    - 'fixed': the variant's `fraction`.
+    - 'all_in': everything.
+    - 'scaled': how far the confidence is above the threshold, rescaled to 0-1.
+
+    :param thresholds: Minimum confidence to act on a BUY or SELL.
+    :param fractions: Fractions for the 'fixed' policy; other policies ignore them.
+    :param cost_bps: Transaction cost in basis points of the traded amount.
+    """
+    rows = []
+    for policy, threshold, fraction, cost in itertools.product(policies, thresholds, fractions, cost_bps):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid sizing policy '{policy}'. Choose one of {POLICIES}.")
+        if policy != 'fixed' and fraction != fractions[0]:
+            continue  # The fraction only matters for 'fixed'; don't repeat identical variants
+        rows.append({'policy': policy, 'threshold': threshold, 'fraction': fraction if policy == 'fixed' else np.nan, 'cost_bps': cost})
+    return pd.DataFrame(rows)
+
+def simulate_ticker(prices, decisions, confidences, variants: pd.DataFrame, initial_cash: float = 10000):
+    """
+    Runs every variant over one ticker's signals at once. The loop is over signals only; each
+    step updates the cash and shares of all variants with array operations.
+
+    :param prices: Execution price of each signal.
+    :param decisions: Decision codes (-1 SELL, 0 HOLD, 1 BUY) of each signal.
+    :param confidences: Debate confidence of each signal.
+    :return: (equity, cash, shares), each of shape (variants, signals), valued after each signal.
+    """
+    n_variants, n_steps = len(variants), len(prices)
+    policy = variants['policy'].to_numpy()
+    threshold = variants['threshold'].to_numpy(dtype='float64')
+    fixed_fraction = variants['fraction'].to_numpy(dtype='float64')
+    keep = 1 - variants['cost_bps'].to_numpy(dtype='float64') / 10000
+
+    cash = np.full(n_variants, float(initial_cash))
+    shares = np.zeros(n_variants)
+    equity = np.empty((n_variants, n_steps))
+    cash_history = np.empty((n_variants, n_steps))
+    shares_history = np.empty((n_variants, n_steps))
+    is_fixed, is_all_in, is_scaled = policy == 'fixed', policy == 'all_in', policy == 'scaled'
+
+    for t in range(n_steps):
+        price, decision, confidence = float(prices[t]), decisions[t], float(confidences[t])
+        if decision != 0:
+            fraction = np.full(n_variants, confidence)
+            fraction[is_fixed] = fixed_fraction[is_fixed]
+            fraction[is_all_in] = 1.0
+            fraction[is_scaled] = np.clip((confidence - threshold[is_scaled]) / (1 - threshold[is_scaled]), 0, 1)
+            act = confidence > threshold
+            if decision == 1:
+                buy = act & (cash > price)
+                investment = np.where(buy, cash * fraction, 0.0)
+                shares += investment * keep / price
+                cash -= investment
+            else:
+                sell = act & (shares > 0)
+                sold = np.where(sell, shares * fraction, 0.0)
+                cash += sold * price * keep
+                shares -= sold
+        equity[:, t] = cash + shares * price
+        cash_history[:, t] = cash
+        shares_history[:, t] = shares
+    return equity, cash_history, shares_history
+
+def simulate(signals: pd.DataFrame, variants: pd.DataFrame, initial_cash: float = 10000):
+    """
+    Simulates every variant on a recorded signal table (see `Trader.signal_table`).
+
+    :return: (summary, equity). `summary` has one row per variant and ticker with final value,
+             return and max drawdown; `equity` maps each ticker to a (variants, signals) array.
+    """
+    rows, equity_curves = [], {}
+    for ticker, ticker_signals in signals.groupby('ticker', sort=False):
+        ticker_signals = ticker_signals.sort_values('timestamp')
+        equity, _, _ = simulate_ticker(
+            ticker_signals['price'].to_numpy(dtype='float64'),
+            ticker_signals['decision'].map(DECISION_CODES).fillna(0).to_numpy(dtype='int8'),
+            ticker_signals['confidence'].to_numpy(dtype='float64'),
+            variants, initial_cash
+        )
+        equity_curves[ticker] = equity
+        peaks = np.maximum.accumulate(equity, axis=1)
+        rows.append(variants.assign(
+            variant=np.arange(len(variants)),
+            ticker=ticker,
+            final_value=equity[:, -1],
+            **{'return': equity[:, -1] / initial_cash - 1},
+            max_drawdown=((equity - peaks) / peaks).min(axis=1)
+        ))
+    summary = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+    return summary, equity_curves
+
+def rank_variants(summary: pd.DataFrame) -> pd.DataFrame:
+    """Averages each variant over tickers and ranks by mean return."""
+    columns = ['variant', 'policy', 'threshold', 'fraction', 'cost_bps']
+    ranked = summary.groupby(columns, dropna=False).agg(
+        mean_return=('return', 'mean'),
+        worst_drawdown=('max_drawdown', 'min')
+    ).reset_index().sort_values('mean_return', ascending=False)
+    return ranked.reset_index(drop=True)
+
+if __name__ == '__main__':
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+    simulator_config = config.get('simulator', {})
+
+    parser = argparse.ArgumentParser(description="Evaluate execution variants on a recorded signal table.")
+    parser.add_argument('--signals', default=config['backtest'].get('signals_path'))
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    signals = pd.read_parquet(args.signals)
+    variants = make_variants(
+        simulator_config.get('policies', POLICIES), simulator_config.get('thresholds', [0.6]),
+        simulator_config.get('fractions', [0.5]), simulator_config.get('cost_bps', [0.0])
+    )
+    print(f"Simulating {len(variants)} execution variants on {len(signals)} signals...")
+    summary, _ = simulate(signals, variants)
+    print(rank_variants(summary).head(args.top).to_string(float_format=lambda value: f"{value:.4f}"))
@@ -0,0 +1,90 @@
+import builtins
+import sys
+import time
+from contextlib import contextmanager
+
+PROFILE_FLAG = '--profile-startup'
+
+class StartupProfile:
+    """
+    Times the imports and setup stages of a cold start.
+
+    While enabled, the first import of every module is timed (including the modules it imports
+    itself), so the report shows which dependencies dominate startup. Stages such as Trader
+    construction are timed with `stage`.
+    """
+    def __init__(self, enabled: bool = False, min_seconds: float = 0.005, max_depth: int = 1):
+        """
+        :param enabled: Whether to install the import hook and record anything.
+        :param min_seconds: Imports faster than this are left out of the report.
+        :param max_depth: Nesting depth of imports shown in the report (0 = top-level only).
+        """
+        self.enabled = enabled
+        self.min_seconds = min_seconds
+        self.max_depth = max_depth
+        self.started = time.perf_counter()
+        self.imports = []  # [depth, module, seconds] in the order the imports started
+        self.stages = []
+        self._depth = 0
+        self._original_import = None
+        if enabled:
+            self._install()
+
+    def _install(self):
+        self._original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return self._original_import(name, globals, locals, fromlist, level)
+            record = [self._depth, name, 0.0]
+            self.imports.append(record)
+            self._depth += 1
+            start = time.perf_counter()
+            try:
+                return self._original_import(name, globals, locals, fromlist, level)
+            finally:
+                self._depth -= 1
+                record[2] = time.perf_counter() - start
+
+        builtins.__import__ = timed_import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    @contextmanager
+    def stage(self, label: str):
+        """Times the enclosed block as a named stage of the startup."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self.stages.append((label, time.perf_counter() - start))
+
+    def report(self) -> str:
+        total = time.perf_counter() - self.started
+        lines = [f"Startup profile ({total:.2f}s since profiling started):", "  Imports:"]
+        top_level = 0.0
+        for depth, name, seconds in self.imports:
+            if depth == 0:
+                top_level += seconds
+            if seconds >= self.min_seconds and depth <= self.max_depth:
+                lines.append(f"    {'  ' * depth}{name:<{40 - 2 * depth}} {seconds:7.3f}s")
+        lines.append(f"    {'total':<40} {top_level:7.3f}s")
+        lines.append("  Stages:")
+        for label, seconds in self.stages:
+            lines.append(f"    {label:<40} {seconds:7.3f}s")
+        return "\n".join(lines)
+
+# Enabled as soon as this module is imported with the flag on the command line, so it must be
+# imported before anything else it should time.
+startup_profile = StartupProfile(enabled=PROFILE_FLAG in sys.argv)
+
+if __name__ == '__main__':
+    profile = StartupProfile(enabled=True)
+    with profile.stage('import pandas'):
+        import pandas
+    profile.uninstall()
+    print(profile.report())
@@ -0,0 +1,230 @@
+import math
+from collections import deque
+
+class RollingWindow:
+    """
+    Fixed-size window over the last `window` values with O(1) updates, used by the rolling
+    indicators. Counts of non-zero values are tracked so an all-zero window reports an exact 0
+    rather than the rounding left over from adding and removing values.
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.nonzero = 0
+
+    def push(self, value: float):
+        """Adds a value, dropping the oldest one once the window is full."""
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            self.total -= old
+            self.nonzero -= old != 0
+        self.values.append(value)
+        self.total += value
+        self.nonzero += value != 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def mean(self) -> float:
+        if not self.full:
+            return math.nan
+        return self.total / self.window if self.nonzero else 0.0
+
+    def get_state(self) -> dict:
+        return {'window': self.window, 'values': list(self.values), 'total': self.total, 'nonzero': self.nonzero}
+
+    def set_state(self, state: dict):
+        self.window = state['window']
+        self.values = deque(state['values'])
+        self.total = state['total']
+        self.nonzero = state['nonzero']
+
+class StreamingRSI:
+    """RSI over simple moving averages of gains and losses, matching `trader.calculate_rsi`."""
+    def __init__(self, window: int = 14):
+        self.gains = RollingWindow(window)
+        self.losses = RollingWindow(window)
+        self.previous_close = math.nan
+
+    def update(self, close: float) -> float:
+        delta = close - self.previous_close
+        self.previous_close = close
+        # A missing delta (first bar, or next to a missing price) counts as neither gain nor loss
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        gain, loss = self.gains.mean(), self.losses.mean()
+        if math.isnan(gain) or (gain == 0 and loss == 0):
+            return math.nan
+        if loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+    def get_state(self) -> dict:
+        return {'gains': self.gains.get_state(), 'losses': self.losses.get_state(), 'previous_close': self.previous_close}
+
+    def set_state(self, state: dict):
+        self.gains.set_state(state['gains'])
+        self.losses.set_state(state['losses'])
+        self.previous_close = state['previous_close']
+
+class StreamingEMA:
+    """Exponential moving average equivalent to `Series.ewm(span=span, adjust=False).mean()`."""
+    def __init__(self, span: int):
+        self.alpha = 2 / (span + 1)
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        if math.isnan(self.value):
+            self.value = x
+        elif not math.isnan(x):
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+    def get_state(self) -> dict:
+        return {'alpha': self.alpha, 'value': self.value}
+
+    def set_state(self, state: dict):
+        self.alpha = state['alpha']
+        self.value = state['value']
+
+class StreamingMACD:
+    """MACD line and signal line, matching `trader.calculate_macd`."""
+    def __init__(self, short_window: int = 12, long_window: int = 26, signal_window: int = 9):
+        self.short_ema = StreamingEMA(short_window)
+        self.long_ema = StreamingEMA(long_window)
+        self.signal_ema = StreamingEMA(signal_window)
+
+    def update(self, close: float):
+        """:return: (macd, signal)"""
+        macd = self.short_ema.update(close) - self.long_ema.update(close)
+        return macd, self.signal_ema.update(macd)
+
+    def get_state(self) -> dict:
+        return {'short_ema': self.short_ema.get_state(), 'long_ema': self.long_ema.get_state(), 'signal_ema': self.signal_ema.get_state()}
+
+    def set_state(self, state: dict):
+        self.short_ema.set_state(state['short_ema'])
+        self.long_ema.set_state(state['long_ema'])
+        self.signal_ema.set_state(state['signal_ema'])
+
+class RollingMeanStd:
+    """
+    Rolling mean and sample standard deviation (ddof=1) over the last `window` values, updated
+    with Welford's algorithm extended to remove the value leaving the window. Like pandas, a
+    window of identical values gets exactly that mean and a zero deviation.
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.repeats = 0  # How many of the latest values equal the last one
+
+    def update(self, x: float):
+        """:return: (mean, std); both NaN until the window is full."""
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            old_mean = self.mean
+            self.mean += (x - old) / self.window
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        else:
+            n = len(self.values) + 1
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        self.repeats = self.repeats + 1 if self.values and self.values[-1] == x else 1
+        self.values.append(x)
+        if self.repeats >= self.window:
+            self.mean, self.m2 = x, 0.0
+        self.m2 = max(self.m2, 0.0)  # Guard against tiny negative rounding
+        return self.current()
+
+    def current(self):
+        if len(self.values) < self.window:
+            return math.nan, math.nan
+        std = math.sqrt(self.m2 / (self.window - 1)) if self.window > 1 else math.nan
+        return self.mean, std
+
+    def get_state(self) -> dict:
+        return {'window': self.window, 'values': list(self.values), 'mean': self.mean, 'm2': self.m2, 'repeats': self.repeats}
+
+    def set_state(self, state: dict):
+        self.window = state['window']
+        self.values = deque(state['values'])
+        self.mean = state['mean']
+        self.m2 = state['m2']
+        self.repeats = state['repeats']
+
+class StreamingBollingerBands:
+    """Upper and lower Bollinger bands, matching `trader.calculate_bollinger_bands`."""
+    def __init__(self, window: int = 20, num_std_dev: float = 2):
+        self.stats = RollingMeanStd(window)
+        self.num_std_dev = num_std_dev
+
+    def update(self, close: float):
+        """:return: (upper_band, lower_band)"""
+        mean, std = self.stats.update(close)
+        return mean + std * self.num_std_dev, mean - std * self.num_std_dev
+
+    def get_state(self) -> dict:
+        return {'stats': self.stats.get_state(), 'num_std_dev': self.num_std_dev}
+
+    def set_state(self, state: dict):
+        self.stats.set_state(state['stats'])
+        self.num_std_dev = state['num_std_dev']
+
+class IndicatorEngine:
+    """
+    Keeps the indicators the agents use up to date one bar at a time, in constant time per bar.
+    Its state is a plain dict, so it can be snapshotted between polls and restored later (or in
+    another process) to continue exactly where it left off.
+    """
+    COLUMNS = ('rsi', 'macd', 'macd_signal', 'upper_band', 'lower_band')
+
+    def __init__(self, rsi_window=14, macd_short_window=12, macd_long_window=26, macd_signal_window=9,
+                 bollinger_window=20, bollinger_num_std_dev=2):
+        self.rsi = StreamingRSI(rsi_window)
+        self.macd = StreamingMACD(macd_short_window, macd_long_window, macd_signal_window)
+        self.bollinger = StreamingBollingerBands(bollinger_window, bollinger_num_std_dev)
+        self.bars = 0
+
+    def update(self, close: float) -> dict:
+        """Adds the close of a new bar and returns the indicator values for it."""
+        close = float(close)
+        rsi = self.rsi.update(close)
+        macd, macd_signal = self.macd.update(close)
+        upper_band, lower_band = self.bollinger.update(close)
+        self.bars += 1
+        return {'rsi': rsi, 'macd': macd, 'macd_signal': macd_signal, 'upper_band': upper_band, 'lower_band': lower_band}
+
+    def snapshot(self) -> dict:
+        return {
+            'rsi': self.rsi.get_state(),
+            'macd': self.macd.get_state(),
+            'bollinger': self.bollinger.get_state(),
+            'bars': self.bars
+        }
+
+    @classmethod
+    def restore(cls, state: dict):
+        engine = cls()
+        engine.rsi.set_state(state['rsi'])
+        engine.macd.set_state(state['macd'])
+        engine.bollinger.set_state(state['bollinger'])
+        engine.bars = state['bars']
+        return engine
+
+if __name__ == '__main__':
+    engine = IndicatorEngine()
+    closes = [100 + math.sin(i / 3) * 5 + i * 0.1 for i in range(40)]
+    for close in closes[:30]:
+        engine.update(close)
+    saved = engine.snapshot()
+    print(engine.update(closes[30]))
+    print(IndicatorEngine.restore(saved).update(closes[30]))
@@ -0,0 +1,149 @@
+import argparse
+import copy
+import itertools
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import yaml
+from data_manager import DataManager
+from trader import Trader, split_rate_limit
+from walk_forward import portfolio_metrics
+
+# Loaded once per process. With the 'fork' start method the workers inherit the parent's copy, so
+# the market data is loaded once and shared copy-on-write instead of being read by every worker.
+_shared = {}
+
+def set_by_path(config: dict, path: str, value):
+    """Sets a nested config value from a dotted path such as 'thresholds.mean_confidence_to_act'."""
+    keys = path.split('.')
+    section = config
+    for key in keys[:-1]:
+        section = section.setdefault(key, {})
+    section[keys[-1]] = value
+
+def generate_configurations(parameters: dict, method: str = 'grid', samples: int = 20, seed: int = 0) -> list:
+    """
+    Expands a sweep spec into a list of {dotted path: value} overrides.
+
+    :param parameters: {dotted path: list of values}. For 'random', a value may also be a
+                       {'low': ..., 'high': ...} range, sampled uniformly (as integers if both
+                       bounds are integers).
+    :param method: 'grid' for every combination, 'random' for `samples` distinct random draws.
+    """
+    paths = sorted(parameters)
+    if method == 'grid':
+        return [dict(zip(paths, values)) for values in itertools.product(*(parameters[path] for path in paths))]
+    if method != 'random':
+        raise ValueError(f"Invalid sweep method '{method}'. Choose 'grid' or 'random'.")
+
+    rng = random.Random(seed)
+
+    def draw(spec):
+        if isinstance(spec, dict):
+            if isinstance(spec['low'], int) and isinstance(spec['high'], int):
+                return rng.randint(spec['low'], spec['high'])
+            return round(rng.uniform(spec['low'], spec['high']), 6)
+        return rng.choice(spec)
+
+    configurations, seen = [], set()
+    for _ in range(samples * 20):  # Bounded, in case the space has fewer than `samples` points
+        if len(configurations) == samples:
+            break
+        overrides = {path: draw(parameters[path]) for path in paths}
+        key = tuple(overrides.values())
+        if key not in seen:
+            seen.add(key)
+            configurations.append(overrides)
+    return configurations
+
+def _init_worker(config: dict, backtest_mode: str):
+    """Loads the market data in the worker, unless it was inherited from the parent by fork."""
+    if not _shared:
+        _shared['data_manager'] = DataManager(config, backtest_mode=backtest_mode)
+    _shared['backtest_mode'] = backtest_mode
+
+def run_configuration(base_config: dict, overrides: dict, number: int) -> dict:
+    """Backtests the base config with `overrides` applied and returns its summary row."""
+    config = copy.deepcopy(base_config)
+    for path, value in overrides.items():
+        set_by_path(config, path, value)
+    print(f"\n=== Sweep configuration {number}: {overrides} ===")
+
+    trader = Trader(backtest_mode=_shared['backtest_mode'], config=config, data_manager=_shared['data_manager'])
+    trader.run_backtest(workers=1)
+    metrics = pd.DataFrame(portfolio_metrics(trader))
+    reflections = trader.memory_manager.reflection_memory
+
+    row = {'configuration': number, **overrides}
+    if metrics.empty:
+        return row
+    row.update({
+        'mean_return': metrics['return'].mean(),
+        'mean_excess_return': (metrics['return'] - metrics['buy_and_hold_return']).mean(),
+        'worst_drawdown': metrics['max_drawdown'].min(),
+        'trades': int((reflections['decision'] != 'HOLD').sum()) if not reflections.empty else 0,
+        'llm_calls': trader.llm.stats.calls,
+        'llm_cache_hits': trader.llm.stats.cache_hits
+    })
+    return row
+
+def run_sweep(config: dict, backtest_mode: str = 'train', workers: int = None, results_dir: str = 'documentation/results'):
+    """
+    Runs every configuration of the `sweep` config section across a process pool and writes a
+    table ranked by `sweep.metric`.
+
+    Workers share the market data (inherited via fork where available) and the on-disk caches:
+    LLM responses (SQLite), precomputed embeddings (memory-mapped) and the feature store, so a
+    prompt answered for one configuration is not sent again for another.
+    """
+    sweep_config = config['sweep']
+    configurations = generate_configurations(
+        sweep_config['parameters'], sweep_config.get('method', 'grid'),
+        sweep_config.get('samples', 20), sweep_config.get('seed', 0)
+    )
+    workers = min(workers or sweep_config.get('workers', 1), len(configurations))
+    print(f"Sweeping {len(configurations)} configuration(s) across {workers} worker(s)...")
+
+    _init_worker(config, backtest_mode)
+    if workers > 1:
+        # Fork shares the loaded data with the workers; elsewhere each worker loads its own copy.
+        method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        worker_config = split_rate_limit(config, workers)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method),
+                                 initializer=_init_worker, initargs=(config, backtest_mode)) as executor:
+            futures = [executor.submit(run_configuration, worker_config, overrides, number)
+                       for number, overrides in enumerate(configurations, start=1)]
+            rows = [future.result() for future in futures]
+    else:
+        rows = [run_configuration(config, overrides, number) for number, overrides in enumerate(configurations, start=1)]
+
+    metric = sweep_config.get('metric', 'mean_return')
+    results = pd.DataFrame(rows)
+    if metric not in results.columns:
+        # No configuration produced the metric (e.g. every run was empty), so there is nothing to rank by
+        print(f"Warning: no configuration reported '{metric}'; results are left unranked.")
+        results[metric] = float('nan')
+    results = results.sort_values(metric, ascending=False, na_position='last').reset_index(drop=True)
+    results.index = results.index + 1
+    results.index.name = 'rank'
+
+    os.makedirs(results_dir, exist_ok=True)
+    results_path = os.path.join(results_dir, 'sweep_results.csv')
+    results.to_csv(results_path)
+    print(f"\nSweep results ranked by {metric}:")
+    print(results.to_string(float_format=lambda value: f"{value:.4f}"))
+    print(f"\nSweep results saved to {results_path}")
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the parameter sweep in the sweep config section.")
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--mode', choices=['train', 'test'], default='train', help="Backtest period to sweep over.")
+    parser.add_argument('--workers', type=int, default=None, help="Configurations run in parallel. Defaults to sweep.workers.")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    run_sweep(config, args.mode, args.workers)
@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from data_manager import DataManager
+
+def write_csv(path):
+    times = pd.date_range('2024-01-01', periods=6, freq='h')
+    pd.DataFrame({
+        'time': np.tile(times, 2),
+        'ticker': ['AAPL'] * 6 + ['MSFT'] * 6,
+        'open': np.linspace(100, 111, 12),
+        'high': np.linspace(101, 112, 12),
+        'low': np.linspace(99, 110, 12),
+        'close': np.linspace(100.5, 111.5, 12),
+        'volume': np.arange(12) * 1000,
+        'news': np.nan,
+        'news_summary': ['Earnings beat', None, None, 'Guidance cut', None, None] * 2,
+    }).to_csv(path, index=False)
+
+def read(path, directory, enabled=True):
+    return DataManager({'data_cache': {'enabled': enabled, 'directory': str(directory)}})._read_csv(str(path))
+
+@pytest.mark.parametrize('enabled', [True, False])
+def test_cached_copy_matches_fresh_read(tmp_path, enabled):
+    path = tmp_path / 'historical_data.csv'
+    write_csv(path)
+    directory = tmp_path / 'cache'
+
+    missed = read(path, directory, enabled)
+    hit = read(path, directory, enabled)
+
+    assert len(list(directory.glob('*.parquet'))) == (1 if enabled else 0)
+    pd.testing.assert_frame_equal(missed, hit)
+    assert missed['ticker'].dtype == 'category'
+    assert missed['news_summary'].dtype == 'category'
+    assert missed['news'].isna().all()
+    assert missed['close'].dtype == np.float32
+
+def test_cache_is_rebuilt_when_csv_changes(tmp_path):
+    path = tmp_path / 'historical_data.csv'
+    write_csv(path)
+    directory = tmp_path / 'cache'
+    read(path, directory)
+
+    data = pd.read_csv(path)
+    data.loc[0, 'close'] = 42.0
+    data.to_csv(path, index=False)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+
+    assert read(path, directory)['close'].iloc[0] == 42.0
+    assert len(list(directory.glob('*.parquet'))) == 1
@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from agents.base_agent import BaseAgent
+from agents.debate import Debate
+from llm.cache import ResponseCache
+from llm.client import LLMClient
+
+ANSWER = "VOTE: BUY, CONFIDENCE: 0.9"
+TIMEOUT = 0.2
+
+class SlowBackend:
+    """Answers every prompt with ANSWER, taking `delays[prompt]` seconds (0 by default)."""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.prompts = []
+
+    def generate(self, model_name, prompt):
+        self.prompts.append(prompt)
+        time.sleep(self.delays.get(prompt, 0))
+        return ANSWER
+
+class PromptAgent(BaseAgent):
+    def build_prompt(self, memory_snapshot: dict):
+        return memory_snapshot['prompt']
+
+def run_steps(cache, backend, steps):
+    llm = LLMClient(backend=backend, cache=cache, requests_per_second=0)
+    debate = Debate([PromptAgent("Agent", {'vote_timeout': TIMEOUT}, semantic_memory=None, llm=llm)], journal=cache)
+    decisions = []
+    for step in steps:
+        if step == 'wait':
+            time.sleep(3 * TIMEOUT)  # Lets a late vote finish
+            continue
+        decisions.append(debate.run({'prompt': f"prompt {step}"}, step=step)[2][0]['decision'])
+    time.sleep(3 * TIMEOUT)
+    return decisions
+
+def test_late_votes_are_journaled_and_replayed(tmp_path):
+    path = str(tmp_path / 'responses.sqlite')
+    steps = ['s0', 's1', 's2', 'wait', 's3']
+    record = ResponseCache(path, 'record')
+    backend = SlowBackend({'prompt s1': 3 * TIMEOUT})
+    # s1 misses its deadline and the agent is still busy with it at s2
+    assert run_steps(record, backend, steps) == ['BUY', 'HOLD', 'HOLD', 'BUY']
+    assert backend.prompts == ['prompt s0', 'prompt s1', 'prompt s3']
+
+    # The late answer is cached as the model gave it, not as the fallback vote
+    assert record.get('gemini-1.5-flash', 'prompt s1') == ANSWER
+
+    # A replay uses the fallback at the same steps, including s2 which was never asked
+    replay = ResponseCache(path, 'replay')
+    assert run_steps(replay, SlowBackend(), steps) == ['BUY', 'HOLD', 'HOLD', 'BUY']
+    assert replay.misses == 0
+
+    # A later record run gets the cached answer in time, which clears the journal entry
+    assert run_steps(ResponseCache(path, 'record'), SlowBackend(), ['s1'])[0] == 'BUY'
+    assert not ResponseCache(path, 'replay').replays_fallback("Agent", 's1')
+    assert ResponseCache(path, 'replay').replays_fallback("Agent", 's2')
+
+def test_replay_without_journal_entry_asks_the_cache(tmp_path):
+    path = str(tmp_path / 'responses.sqlite')
+    run_steps(ResponseCache(path, 'record'), SlowBackend(), ['s0'])
+    replay = ResponseCache(path, 'replay')
+    assert run_steps(replay, SlowBackend(), ['s0']) == ['BUY']
+    assert replay.hits == 1
@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from streaming_indicators import IndicatorEngine
+from trader import calculate_rsi, calculate_macd, calculate_bollinger_bands
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'historical_data.csv')
+RTOL = 1e-9
+ATOL = 1e-8
+
+def batch_indicators(data: pd.DataFrame) -> pd.DataFrame:
+    result = pd.DataFrame(index=data.index)
+    result['rsi'] = calculate_rsi(data)
+    result['macd'], result['macd_signal'] = calculate_macd(data)
+    result['upper_band'], result['lower_band'] = calculate_bollinger_bands(data)
+    return result
+
+def streaming_indicators(data: pd.DataFrame, restore_every: int = 0) -> pd.DataFrame:
+    """
+    Feeds the closes to an IndicatorEngine one bar at a time. With `restore_every`, the engine
+    is snapshotted and rebuilt from the snapshot every that many bars, which must not change
+    any value.
+    """
+    engine = IndicatorEngine()
+    rows = []
+    for bar, close in enumerate(data['close'], start=1):
+        rows.append(engine.update(close))
+        if restore_every and bar % restore_every == 0:
+            engine = IndicatorEngine.restore(engine.snapshot())
+    return pd.DataFrame(rows, index=data.index, columns=list(IndicatorEngine.COLUMNS))
+
+def synthetic_series(seed: int, length: int) -> pd.DataFrame:
+    """A random walk with flat stretches, so the windows of all-zero gains or losses are exercised."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 1, length)
+    steps[rng.random(length) < 0.2] = 0
+    steps[length // 3:length // 3 + 30] = 0
+    steps[length // 2:length // 2 + 20] = np.abs(steps[length // 2:length // 2 + 20])
+    return pd.DataFrame({'close': 100 + np.cumsum(steps)})
+
+def historical_series() -> dict:
+    if not os.path.exists(DATA_PATH):
+        return {}
+    history = pd.read_csv(DATA_PATH, parse_dates=['time'])
+    return {ticker: ticker_data.set_index('time') for ticker, ticker_data in history.groupby('ticker')}
+
+SERIES = {**historical_series(), **{f"synthetic-{seed}": synthetic_series(seed, 2000) for seed in range(5)}}
+
+@pytest.mark.parametrize('restore_every', [0, 7])
+@pytest.mark.parametrize('name', list(SERIES))
+def test_streaming_matches_batch(name, restore_every):
+    data = SERIES[name]
+    expected = batch_indicators(data)
+    actual = streaming_indicators(data, restore_every)
+    # A rolling std is the square root of a difference of running sums, so on nearly flat windows
+    # either implementation can be off by about sqrt(window * eps) times the price level.
+    band_atol = max(ATOL, 2 * np.sqrt(20 * np.finfo('float64').eps) * data['close'].abs().max())
+    for column in IndicatorEngine.COLUMNS:
+        a, b = actual[column].to_numpy(dtype='float64'), expected[column].to_numpy(dtype='float64')
+        atol = band_atol if column.endswith('_band') else ATOL
+        assert np.allclose(a, b, rtol=RTOL, atol=atol, equal_nan=True), \
+            f"{name} {column}: max abs diff {np.nanmax(np.abs(a - b)):.3e}"
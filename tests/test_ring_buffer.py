@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from memory.ring_buffer import RingBuffer
+from memory.memory_manager import MemoryManager
+
+def frame(start: int, rows: int, text_dtype=None) -> pd.DataFrame:
+    data = pd.DataFrame({
+        'ticker': ['AAPL'] * rows,
+        'close': np.arange(start, start + rows, dtype='float64'),
+        'news': [np.nan] * rows,
+        'news_summary': [f"headline {i % 3}" if i % 2 else None for i in range(start, start + rows)]
+    }, index=pd.date_range('2024-01-01', periods=rows, freq='D', name='time') + pd.Timedelta(days=start))
+    if text_dtype is not None:
+        data = data.astype({'ticker': text_dtype, 'news': text_dtype, 'news_summary': text_dtype})
+    return data
+
+@pytest.mark.parametrize('text_dtype', [None, object, 'category'])
+def test_all_missing_text_column(text_dtype):
+    buffer = RingBuffer(4)
+    buffer.append(frame(0, 3, text_dtype))
+    buffer.append(frame(3, 3, text_dtype))
+    view = buffer.view()
+    assert len(view) == 4
+    assert view['news'].isna().all()
+    summaries = view['news_summary'].astype(object).where(view['news_summary'].notna(), None)
+    assert summaries.tolist() == [None if i % 2 == 0 else f"headline {i % 3}" for i in range(2, 6)]
+    assert pd.isna(buffer.last_value('news'))
+
+def test_view_matches_appended_rows():
+    buffer = RingBuffer(5)
+    for start in range(0, 12, 3):
+        buffer.append(frame(start, 3))
+    expected = frame(0, 12).iloc[-5:]
+    view = buffer.view()
+    assert view.index.equals(expected.index)
+    assert view['close'].tolist() == expected['close'].tolist()
+    assert view['ticker'].astype(object).tolist() == expected['ticker'].tolist()
+
+def test_snapshot_is_not_overwritten_by_later_updates():
+    memory = MemoryManager({'short_term': 3, 'mid_term': 5, 'long_term': 8})
+    history = frame(0, 20, 'category')
+    memory.update_memory(history.iloc[:10])
+    snapshot = memory.get_memory_snapshot()
+    before = snapshot['long_term']['close'].tolist()
+    memory.update_memory(history)
+    assert snapshot['long_term']['close'].tolist() == before
+    assert [len(snapshot[layer]) for layer in MemoryManager.LAYERS] == [3, 5, 8]
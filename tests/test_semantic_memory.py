@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import numpy as np
+import pandas as pd
+import pytest
+
+faiss = pytest.importorskip('faiss')
+from memory.semantic_memory import SemanticMemory
+
+DIMENSION = 16
+
+class HashEncoder:
+    """Deterministic stand-in for the sentence transformer: one random vector per text."""
+
+    def encode(self, texts, batch_size=None):
+        return np.vstack([
+            np.random.default_rng(int(hashlib.sha1(text.encode('utf-8')).hexdigest()[:8], 16)).standard_normal(DIMENSION)
+            for text in texts
+        ]).astype('float32')
+
+def new_memory(**kwargs):
+    memory = SemanticMemory(dimension=DIMENSION, **kwargs)
+    memory._model = HashEncoder()
+    return memory
+
+def news(start, count):
+    texts = [f"headline {i}" for i in range(start, start + count)]
+    timestamps = list(pd.date_range('2024-01-01', periods=count, freq='h') + pd.Timedelta(hours=start))
+    return texts, timestamps, ['AAPL'] * count
+
+def test_ivf_memory_can_be_added_to_after_reload(tmp_path):
+    memory = new_memory(index_type='ivf', promote_threshold=64)
+    memory.add_memories(*news(0, 80))
+    assert memory.active_index_type == 'ivf'
+    memory.save(str(tmp_path))
+
+    reloaded = SemanticMemory.load(str(tmp_path), read_only=False)
+    reloaded._model = HashEncoder()
+    assert reloaded.add_memories(*news(80, 10)) == 10
+    assert reloaded.index.ntotal == 90
+    assert reloaded.search_memory("headline 85", k=1, ticker='AAPL')[0]['text'] == "headline 85"
+
+def test_read_only_memory_rejects_new_memories(tmp_path):
+    memory = new_memory(index_type='ivf', promote_threshold=64)
+    memory.add_memories(*news(0, 80))
+    memory.save(str(tmp_path))
+
+    reloaded = SemanticMemory.load(str(tmp_path))
+    reloaded._model = HashEncoder()
+    with pytest.raises(RuntimeError):
+        reloaded.add_memories(*news(80, 1))
+    assert reloaded.search_memory("headline 5", k=1, ticker='AAPL')[0]['text'] == "headline 5"
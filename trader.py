@@ -1,12 +1,23 @@
+from startup_profile import startup_profile, PROFILE_FLAG  # Imported first so it can time the imports below
+import argparse
+import copy
+import os
 import yaml
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 from data_manager import DataManager
+from feature_store import FeatureStore, DEFAULT_INDICATORS
 from memory.memory_manager import MemoryManager
 from memory.semantic_memory import SemanticMemory
+from memory.embedding_store import EmbeddingStore
 from agents.short_agent import ShortTermAgent
 from agents.mid_agent import MidTermAgent
 from agents.long_agent import LongTermAgent
 from agents.debate import Debate
+from llm.cache import ResponseCache
+from llm.client import LLMClient
+from metrics import MetricsAccumulator
 
 def calculate_rsi(data, window=14):
     delta = data['close'].diff()
@@ -30,115 +41,378 @@ def calculate_bollinger_bands(data, window=20, num_std_dev=2):
     lower_band = rolling_mean - (rolling_std * num_std_dev)
     return upper_band, lower_band
 
+def split_rate_limit(config, workers):
+    """Returns a copy of `config` whose LLM request rate is divided between `workers` processes."""
+    worker_config = copy.deepcopy(config)
+    llm_config = worker_config.setdefault('llm', {})
+    llm_config['requests_per_second'] = llm_config.get('requests_per_second', 1.0) / workers
+    return worker_config
+
+def _backtest_worker(config, backtest_mode, tickers, period=None, trade_start=None):
+    """
+    Runs a backtest for a group of tickers in a worker process with its own Trader, so memory
+    layers, semantic index and portfolios are isolated from every other group.
+    """
+    trader = Trader(backtest_mode=backtest_mode, config=config, period=period, trade_start=trade_start)
+    trader.run_backtest(tickers=tickers, workers=1)
+    return trader.portfolios, trader.memory_manager.reflection_memory, trader.signals, trader.run_stats()
+
 class Trader:
-    def __init__(self, config_path='config.yaml', backtest_mode='train'):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self, config_path='config.yaml', backtest_mode='train', config=None, period=None,
+                 trade_start=None, data_manager=None):
+        """
+        :param config_path: Path to the YAML configuration file.
+        :param backtest_mode: 'train', 'test' or 'all'.
+        :param config: An already loaded configuration dictionary; takes precedence over `config_path`.
+        :param period: Optional (start, end) of the data to load, overriding `backtest_mode`'s period.
+        :param trade_start: If set, data before this time only serves as history for memory and
+                            indicators; decisions and trades start from it.
+        :param data_manager: An already loaded DataManager to use instead of loading the data again.
+        """
+        if config is None:
+            with open(config_path, 'r') as f:
+                config = yaml.safe_load(f)
+        self.config = config
+        self.backtest_mode = backtest_mode
+        self.period = period
+        self.trade_start = None if trade_start is None else pd.to_datetime(trade_start)
+
+        self.data_manager = data_manager or DataManager(self.config, backtest_mode=backtest_mode, period=period)
+        self.indicator_params = {**DEFAULT_INDICATORS, **self.config.get('indicators', {})}
+        feature_config = self.config.get('feature_store', {})
+        self.feature_store = FeatureStore(feature_config.get('directory')) if feature_config.get('enabled', True) else None
+        self._features_by_ticker = None
+        self.memory_manager = MemoryManager(
+            self.config['memory_horizons'], self.config.get('reflection_log'), self.config.get('memory_snapshot_rows'),
+            self.config.get('memory_snapshot_reflections', 0)
+        )
+        semantic_config = self.config.get('semantic_memory', {})
+        semantic_kwargs = dict(
+            batch_size=semantic_config.get('batch_size'),
+            cache_size=semantic_config.get('cache_size', 256),
+            nprobe=semantic_config.get('nprobe', 16),
+            hnsw_m=semantic_config.get('hnsw_m', 32),
+            embedding_store=EmbeddingStore.open(semantic_config.get('embedding_store'))
+        )
+        store_path = semantic_config.get('store')
+        if store_path and os.path.exists(os.path.join(store_path, 'meta.json')):
+            # Warm start from a prebuilt memory; nothing is embedded again.
+            self.semantic_memory = SemanticMemory.load(store_path, read_only=semantic_config.get('read_only', True), **semantic_kwargs)
+        else:
+            self.semantic_memory = SemanticMemory(
+                index_type=semantic_config.get('index_type', 'flat'),
+                promote_threshold=semantic_config.get('promote_threshold', 50000),
+                **semantic_kwargs
+            )
 
-        self.data_manager = DataManager(self.config, backtest_mode=backtest_mode)
-        self.memory_manager = MemoryManager(self.config['memory_horizons'])
-        self.semantic_memory = SemanticMemory()
+        # All agents share one rate-limited LLM client and persistent response cache
+        self.response_cache = ResponseCache.from_config(self.config.get('llm_cache'))
+        self.llm = LLMClient.from_config(self.config.get('llm'), cache=self.response_cache)
 
         # Initialize agents with semantic memory
-        self.short_term_agent = ShortTermAgent(name="Short-Term Agent", config={}, semantic_memory=self.semantic_memory)
-        self.mid_term_agent = MidTermAgent(name="Mid-Term Agent", config={}, semantic_memory=self.semantic_memory)
-        self.long_term_agent = LongTermAgent(name="Long-Term Agent", config={}, semantic_memory=self.semantic_memory)
+        self.short_term_agent = ShortTermAgent(name="Short-Term Agent", config=self._agent_config('short_term'), semantic_memory=self.semantic_memory, llm=self.llm)
+        self.mid_term_agent = MidTermAgent(name="Mid-Term Agent", config=self._agent_config('mid_term'), semantic_memory=self.semantic_memory, llm=self.llm)
+        self.long_term_agent = LongTermAgent(name="Long-Term Agent", config=self._agent_config('long_term'), semantic_memory=self.semantic_memory, llm=self.llm)
         
         self.agents = [self.short_term_agent, self.mid_term_agent, self.long_term_agent]
-        self.debate = Debate(self.agents)
+        debate_config = self.config.get('debate', {})
+        self.debate = Debate(
+            self.agents,
+            concurrent=debate_config.get('concurrent', True),
+            vote_timeout=debate_config.get('vote_timeout'),
+            journal=self.response_cache
+        )
         self.portfolios = {}
+        self.signals = []  # One row per debate, before any execution rule is applied
+
+    def _agent_config(self, name: str) -> dict:
+        """An agent's config, with its `gate` settings layered over the shared `vote_gate` section."""
+        agent_config = dict(self.config.get('agents', {}).get(name, {}))
+        agent_config['gate'] = {**self.config.get('vote_gate', {}), **agent_config.get('gate', {})}
+        return agent_config
+
+    def run_backtest(self, tickers=None, workers=None):
+        """
+        Runs the backtest for the given tickers (all loaded tickers by default).
 
-    def run_backtest(self):
+        With more than one worker, tickers are split into groups of `tickers_per_worker` and each
+        group runs in its own process; the results are merged back into `self.portfolios` and the
+        reflection log in ticker order, and the workers' LLM, cache and vote-gate counters into this
+        trader's reports. If any agent has a `batch_size` above 1, the tickers are
+        stepped through time together so their prompts can be batched.
+
+        :param tickers: Tickers to backtest.
+        :param workers: Number of worker processes. Defaults to `backtest.workers` in the config.
+        """
         print("Starting backtest...")
-        tickers = self.data_manager.tickers
+        tickers = list(self.data_manager.tickers if tickers is None else tickers)
+        if workers is None:
+            workers = self.config['backtest'].get('workers', 1)
+
+        if workers > 1 and len(tickers) > 1:
+            self._run_parallel(tickers, workers)
+        elif any(agent.config.get('batch_size', 1) > 1 for agent in self.agents):
+            self._run_lockstep(tickers)
+        else:
+            for ticker in tickers:
+                self._run_ticker(ticker)
+
+        print("\nBacktest finished.")
+        print(self.llm.report())
+        print(self.semantic_memory.cache_report())
+        for agent in self.agents:
+            if agent.gate is not None:
+                print(agent.gate.report(agent.name))
 
+    def run_stats(self) -> dict:
+        """LLM, semantic-cache and vote-gate counters of this trader, picklable for `merge_stats`."""
+        return {
+            'llm': self.llm.stats.counters(),
+            'semantic_cache': dict(self.semantic_memory.cache_counters),
+            'gates': {agent.name: (agent.gate.hits, agent.gate.misses) for agent in self.agents if agent.gate is not None}
+        }
+
+    def merge_stats(self, stats: dict):
+        """Adds counters returned by another trader's `run_stats`, e.g. from a worker process."""
+        self.llm.stats.merge(stats['llm'])
+        self.semantic_memory.merge_cache_counters(stats['semantic_cache'])
+        for agent in self.agents:
+            if agent.gate is not None and agent.name in stats['gates']:
+                agent.gate.merge(*stats['gates'][agent.name])
+
+    def _run_parallel(self, tickers, workers):
+        group_size = self.config['backtest'].get('tickers_per_worker', 1)
+        groups = [tickers[i:i + group_size] for i in range(0, len(tickers), group_size)]
+        workers = min(workers, len(groups))
+        print(f"Running {len(groups)} ticker group(s) across {workers} worker processes...")
+        if self.feature_store is not None:
+            self._ticker_features()  # Computed once here; the workers then only read the stored file
+
+        # Every worker has its own LLM client, so split the request rate between them.
+        worker_config = split_rate_limit(self.config, workers)
+
+        # 'spawn' keeps workers clear of threads started by torch/faiss in the parent process.
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [executor.submit(_backtest_worker, worker_config, self.backtest_mode, group, self.period, self.trade_start) for group in groups]
+            for future in futures:
+                portfolios, reflections, signals, stats = future.result()
+                self.merge_stats(stats)
+                self.signals.extend(signals)
+                self.portfolios.update(portfolios)
+                self.memory_manager.reflection_log.extend(reflections)
+
+    def _run_ticker(self, ticker):
+        ticker_data = self._prepare_ticker(ticker)
+        if ticker_data is None:
+            return
+
+        # Iterate through the data for the current ticker
+        for i in self._decision_steps(ticker_data):
+            memory_snapshot = self._observe(ticker, ticker_data, i)
+            final_decision, final_confidence, votes = self.debate.run(memory_snapshot, step=f"{ticker} {ticker_data.index[i - 1]}")
+            self._act(ticker, ticker_data, i, final_decision, final_confidence, votes)
+
+        self._finish_ticker(ticker, ticker_data)
+
+    def _run_lockstep(self, tickers):
+        """
+        Steps all tickers through time together so that every ticker deciding at the same
+        timestamp is debated in one batch, letting agents pack those prompts into shared requests.
+        """
+        schedule = {}
+        ticker_frames = {}
         for ticker in tickers:
-            print(f"\n--- Running backtest for {ticker} ---")
-            self.portfolios[ticker] = {'cash': 10000, 'shares': 0, 'value_history': []}
-            ticker_data = self.data_manager.get_data_for_ticker(ticker)
-            
-            # --- Add Technical Indicators ---
-            ticker_data['rsi'] = calculate_rsi(ticker_data)
-            ticker_data['macd'], ticker_data['macd_signal'] = calculate_macd(ticker_data)
-            ticker_data['upper_band'], ticker_data['lower_band'] = calculate_bollinger_bands(ticker_data)
-            
-            if ticker_data.empty:
-                print(f"No data for {ticker}, skipping.")
+            ticker_data = self._prepare_ticker(ticker)
+            if ticker_data is None:
                 continue
+            ticker_frames[ticker] = ticker_data
+            for i in self._decision_steps(ticker_data):
+                schedule.setdefault(ticker_data.index[i - 1], []).append((ticker, i))
 
-            # Iterate through the data for the current ticker
-            for i in range(1, len(ticker_data)):
-                # Run debate only once a week (every 5 trading days) 
-                if i % 5 != 0:
-                    continue
-
-                current_price = ticker_data['close'].iloc[i]
-                current_data_slice = ticker_data.iloc[:i]
-                self.memory_manager.update_memory(current_data_slice)
-                memory_snapshot = self.memory_manager.get_memory_snapshot()
-
-                # Add news to semantic memory if available
-                if 'news_summary' in current_data_slice.columns and not pd.isna(current_data_slice['news_summary'].iloc[-1]):
-                    news_text = current_data_slice['news_summary'].iloc[-1]
-                    if news_text != 'No significant news':
-                        self.semantic_memory.add_memory(news_text)
-
-                final_decision, final_confidence, votes = self.debate.run(memory_snapshot)
-
-                # What this does:
-                # If the confidence is high enough, it will make a decision to buy or sell.
-                # If the confidence is not high enough, it will hold.
-                # If the confidence is high enough, it will make a decision to buy or sell. 
-                if final_confidence > self.config['thresholds']['mean_confidence_to_act']:
-                    if final_decision == 'BUY' and self.portfolios[ticker]['cash'] > current_price:
-                        # Proportional bet sizing
-                        investment_amount = self.portfolios[ticker]['cash'] * final_confidence
-                        shares_to_buy = investment_amount / current_price
-                        self.portfolios[ticker]['shares'] += shares_to_buy
-                        self.portfolios[ticker]['cash'] -= investment_amount
-                        outcome = 'profit' # Simplified
-                    elif final_decision == 'SELL' and self.portfolios[ticker]['shares'] > 0:
-                        # Proportional selling
-                        shares_to_sell = self.portfolios[ticker]['shares'] * final_confidence
-                        self.portfolios[ticker]['cash'] += shares_to_sell * current_price
-                        self.portfolios[ticker]['shares'] -= shares_to_sell
-                        outcome = 'profit' # Simplified
-                    else: # HOLD
-                        outcome = 'neutral'
-                else:
-                    final_decision = 'HOLD' # Override decision if confidence is too low
-                    outcome = 'neutral'
-                
-                # The outcome of a trade is only known when it's closed.
-                # We will simplify the 'outcome' and focus the reflection on the 'why'.
-                trade_outcome = "trade_executed" if final_decision != 'HOLD' else 'hold'
-                
-                # Update portfolio value history
-                portfolio_value = self.portfolios[ticker]['cash'] + self.portfolios[ticker]['shares'] * current_price
-                self.portfolios[ticker]['value_history'].append((current_data_slice.index[-1], portfolio_value))
-
-                # Summarize agent votes for a more insightful reflection
-                agent_votes_summary = ", ".join([f"{v['agent'].replace(' Agent', '')}: {v['decision']}({v['confidence']:.1f})" for v in votes])
-                reflection_text = f"[{ticker}] Decision: {final_decision}, Conf: {final_confidence:.2f}. Votes: [{agent_votes_summary}]. Value: ${portfolio_value:,.2f}"
-                
-                self.memory_manager.add_reflection(
-                    timestamp=current_data_slice.index[-1],
-                    decision=final_decision,
-                    confidence=final_confidence,
-                    outcome=trade_outcome,
-                    reflection=reflection_text
-                )
-
-                if i % 100 == 0: # Print progress every 100 (processed) days
-                    print(f"  Processed up to day {i} for {ticker}. Last decision: {final_decision}")
+        for timestamp in sorted(schedule):
+            steps = schedule[timestamp]
+            snapshots = [self._observe(ticker, ticker_frames[ticker], i) for ticker, i in steps]
+            results = self.debate.run_batch(snapshots, steps=[f"{ticker} {timestamp}" for ticker, _ in steps])
+            for (ticker, i), (final_decision, final_confidence, votes) in zip(steps, results):
+                self._act(ticker, ticker_frames[ticker], i, final_decision, final_confidence, votes)
 
-        print("\nBacktest finished.")
+        for ticker, ticker_data in ticker_frames.items():
+            self._finish_ticker(ticker, ticker_data)
+
+    def _prepare_ticker(self, ticker):
+        """Sets up the portfolio and indicator data for a ticker; returns None if there is no data."""
+        print(f"\n--- Running backtest for {ticker} ---")
+        self.portfolios[ticker] = {'cash': 10000, 'shares': 0, 'value_history': []}
+        ticker_data = self.data_manager.get_data_for_ticker(ticker)
+        if ticker_data.empty:
+            print(f"No data for {ticker}, skipping.")
+            return None
+        self.portfolios[ticker]['metrics'] = self._metrics_accumulator(ticker_data)
+
+        # --- Add Technical Indicators ---
+        if self.feature_store is not None:
+            features = self._ticker_features()[ticker]
+            for column in FeatureStore.FEATURES:
+                ticker_data[column] = features[column].to_numpy()
+        else:
+            params = self.indicator_params
+            ticker_data['rsi'] = calculate_rsi(ticker_data, params['rsi_window'])
+            ticker_data['macd'], ticker_data['macd_signal'] = calculate_macd(
+                ticker_data, params['macd_short_window'], params['macd_long_window'], params['macd_signal_window']
+            )
+            ticker_data['upper_band'], ticker_data['lower_band'] = calculate_bollinger_bands(
+                ticker_data, params['bollinger_window'], params['bollinger_num_std_dev']
+            )
+        self._add_news(ticker, ticker_data)
+        return ticker_data
+
+    def _add_news(self, ticker, ticker_data):
+        """
+        Adds the news of every decision bar to semantic memory in one batch before the ticker runs,
+        instead of embedding one item per step. Searches are filtered by `as_of`, so agents still
+        only see news up to the bar they decide on.
+        """
+        # A read-only prebuilt memory already holds the news
+        if 'news_summary' not in ticker_data.columns or self.semantic_memory.read_only:
+            return
+        news = ticker_data['news_summary'].iloc[[i - 1 for i in self._decision_steps(ticker_data)]]
+        news = news[news.notna() & (news != 'No significant news')]
+        if len(news):
+            self.semantic_memory.add_memories(list(news), list(news.index), [ticker] * len(news))
+
+    def _metrics_accumulator(self, ticker_data) -> MetricsAccumulator:
+        """A metrics accumulator whose buy-and-hold benchmark buys at the first tradable bar."""
+        metrics_config = self.config.get('metrics', {})
+        interval = self.config['backtest'].get('decision_interval', 5)
+        first = 0 if self.trade_start is None else min(int(ticker_data.index.searchsorted(self.trade_start)), len(ticker_data) - 1)
+        return MetricsAccumulator(
+            initial_value=10000,
+            benchmark_price=float(ticker_data['close'].iloc[first]),
+            periods_per_year=metrics_config.get('bars_per_year', 252) / interval,
+            rolling_window=metrics_config.get('rolling_window', 12)
+        )
+
+    def _finish_ticker(self, ticker, ticker_data):
+        """Values the ticker's benchmark at its last bar and frees its memory layers."""
+        self.portfolios[ticker]['metrics'].mark_benchmark(float(ticker_data['close'].iloc[-1]))
+        print(f"  {ticker}: {self.portfolios[ticker]['metrics'].format()}")
+        self.memory_manager.release(ticker)
+
+    def _ticker_features(self) -> dict:
+        """Indicators for every ticker, computed (or read from the feature store) on first use."""
+        if self._features_by_ticker is None:
+            features = self.feature_store.get_features(self.data_manager.all_historical_data, self.indicator_params)
+            self._features_by_ticker = {
+                ticker: frame for ticker, frame in features.groupby('ticker', observed=True, sort=False)
+            }
+        return self._features_by_ticker
+
+    def _decision_steps(self, ticker_data):
+        # Run debate only once every `decision_interval` bars (by default once a week, every 5 trading days)
+        interval = self.config['backtest'].get('decision_interval', 5)
+        start = interval
+        if self.trade_start is not None:
+            start = max(start, int(ticker_data.index.searchsorted(self.trade_start)))
+        return range(start, len(ticker_data), interval)
+
+    def _observe(self, ticker, ticker_data, i) -> dict:
+        """Updates memory with the data up to step `i` and returns the ticker's memory snapshot."""
+        self.memory_manager.update_memory(ticker_data.iloc[:i])
+        return self.memory_manager.get_memory_snapshot(ticker)
+
+    def _act(self, ticker, ticker_data, i, final_decision, final_confidence, votes):
+        """Executes the debate's decision at step `i` and records the signal, portfolio value and reflection."""
+        current_price = float(ticker_data['close'].iloc[i])  # Prices may be stored as float32
+        timestamp = ticker_data.index[i - 1]
+        self._record_signal(ticker, timestamp, current_price, final_decision, final_confidence, votes)
+
+        # What this does:
+        # If the confidence is high enough, it will make a decision to buy or sell.
+        # If the confidence is not high enough, it will hold.
+        # If the confidence is high enough, it will make a decision to buy or sell. 
+        traded = 0.0
+        if final_confidence > self.config['thresholds']['mean_confidence_to_act']:
+            if final_decision == 'BUY' and self.portfolios[ticker]['cash'] > current_price:
+                # Proportional bet sizing
+                investment_amount = self.portfolios[ticker]['cash'] * final_confidence
+                shares_to_buy = investment_amount / current_price
+                self.portfolios[ticker]['shares'] += shares_to_buy
+                self.portfolios[ticker]['cash'] -= investment_amount
+                traded = investment_amount
+                outcome = 'profit' # Simplified
+            elif final_decision == 'SELL' and self.portfolios[ticker]['shares'] > 0:
+                # Proportional selling
+                shares_to_sell = self.portfolios[ticker]['shares'] * final_confidence
+                self.portfolios[ticker]['cash'] += shares_to_sell * current_price
+                self.portfolios[ticker]['shares'] -= shares_to_sell
+                traded = shares_to_sell * current_price
+                outcome = 'profit' # Simplified
+            else: # HOLD
+                outcome = 'neutral'
+        else:
+            final_decision = 'HOLD' # Override decision if confidence is too low
+            outcome = 'neutral'
+        
+        # The outcome of a trade is only known when it's closed.
+        # We will simplify the 'outcome' and focus the reflection on the 'why'.
+        trade_outcome = "trade_executed" if final_decision != 'HOLD' else 'hold'
+        
+        # Update portfolio value history
+        portfolio_value = self.portfolios[ticker]['cash'] + self.portfolios[ticker]['shares'] * current_price
+        self.portfolios[ticker]['value_history'].append((timestamp, portfolio_value))
+        self.portfolios[ticker]['metrics'].update(portfolio_value, current_price, traded)
+
+        # Summarize agent votes for a more insightful reflection
+        agent_votes_summary = ", ".join([f"{v['agent'].replace(' Agent', '')}: {v['decision']}({v['confidence']:.1f})" for v in votes])
+        reflection_text = f"[{ticker}] Decision: {final_decision}, Conf: {final_confidence:.2f}. Votes: [{agent_votes_summary}]. Value: ${portfolio_value:,.2f}"
+        
+        self.memory_manager.add_reflection(
+            timestamp=timestamp,
+            decision=final_decision,
+            confidence=final_confidence,
+            outcome=trade_outcome,
+            reflection=reflection_text
+        )
+
+        if i % 100 == 0: # Print progress every 100 (processed) days
+            print(f"  Processed up to day {i} for {ticker}. Last decision: {final_decision}; {self.portfolios[ticker]['metrics'].format()}")
+
+    def _record_signal(self, ticker, timestamp, price, decision, confidence, votes):
+        signal = {'ticker': ticker, 'timestamp': timestamp, 'price': price, 'decision': decision, 'confidence': float(confidence)}
+        for vote in votes:
+            agent = vote['agent'].replace(' Agent', '').replace('-', '_').replace(' ', '_').lower()
+            signal[f"{agent}_decision"] = vote['decision']
+            signal[f"{agent}_confidence"] = float(vote['confidence'])
+        self.signals.append(signal)
+
+    def signal_table(self) -> pd.DataFrame:
+        """
+        The debate results of the last backtest: ticker, decision time, execution price, decision,
+        confidence and each agent's vote. `simulator.py` replays execution policies on this table
+        without running the agents again.
+        """
+        return pd.DataFrame(self.signals).sort_values(['ticker', 'timestamp'], kind='stable').reset_index(drop=True) if self.signals else pd.DataFrame()
+
+    def save_signals(self, path=None):
+        """Writes the signal table to `path` (default `backtest.signals_path`), if there is one."""
+        path = path or self.config['backtest'].get('signals_path')
+        if not path or not self.signals:
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.signal_table().to_parquet(path, index=False)
+        print(f"Signal table with {len(self.signals)} rows saved to {path}")
 
 if __name__ == '__main__':
-    # To run with training data
-    trader_train = Trader(backtest_mode='train')
-    trader_train.run_backtest()
+    parser = argparse.ArgumentParser(description="Run a backtest.")
+    parser.add_argument('--mode', choices=['train', 'test'], default='train', help="Backtest on the training or testing period.")
+    parser.add_argument(PROFILE_FLAG, action='store_true', help="Print a breakdown of import and setup time before the backtest.")
+    args = parser.parse_args()
 
-    # To run with testing data
-    # trader_test = Trader(backtest_mode='test')
-    # trader_test.run_backtest()
+    with startup_profile.stage('Trader construction'):
+        trader = Trader(backtest_mode=args.mode)
+    if args.profile_startup:
+        startup_profile.uninstall()
+        print(startup_profile.report())
+    trader.run_backtest()
+    trader.save_signals()
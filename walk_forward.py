@@ -0,0 +1,155 @@
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import yaml
+from data_manager import DataManager
+from trader import Trader, split_rate_limit
+
+def generate_windows(start, end, train_months, test_months, step_months=None, mode='rolling'):
+    """
+    Splits [start, end] into consecutive train/test windows.
+
+    :param train_months: Length of the training part of each window.
+    :param test_months: Length of the test part of each window.
+    :param step_months: How far each window moves forward. Defaults to `test_months`, so the
+                        test parts tile the range without overlapping.
+    :param mode: 'rolling' keeps the training part at `train_months`; 'expanding' keeps it
+                 anchored at `start` so it grows with every window.
+    :return: A list of dicts with 'train_start', 'train_end', 'test_start' and 'test_end'.
+    """
+    if mode not in ('rolling', 'expanding'):
+        raise ValueError(f"Invalid walk-forward mode '{mode}'. Choose 'rolling' or 'expanding'.")
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    step = pd.DateOffset(months=step_months or test_months)
+    windows = []
+    train_start = start
+    test_start = start + pd.DateOffset(months=train_months)
+    while test_start <= end:
+        test_end = min(test_start + pd.DateOffset(months=test_months) - pd.Timedelta(days=1), end)
+        windows.append({
+            'train_start': train_start,
+            'train_end': test_start - pd.Timedelta(days=1),
+            'test_start': test_start,
+            'test_end': test_end
+        })
+        test_start = test_start + step
+        if mode == 'rolling':
+            train_start = train_start + step
+    return windows
+
+def portfolio_metrics(trader: Trader) -> list:
+    """
+    Per-ticker results of a finished backtest, read from the metrics each portfolio accumulated
+    during the run: final value, return, buy-and-hold return (from the first tradable bar),
+    maximum drawdown, Sharpe ratio and turnover.
+    """
+    rows = []
+    for ticker, portfolio in trader.portfolios.items():
+        if not portfolio['value_history']:
+            continue
+        metrics = portfolio['metrics']
+        rows.append({
+            'ticker': ticker,
+            'final_value': metrics.value,
+            'return': metrics.total_return,
+            'buy_and_hold_return': metrics.benchmark_return,
+            'max_drawdown': metrics.max_drawdown,
+            'sharpe': metrics.sharpe,
+            'turnover': metrics.turnover
+        })
+    return rows
+
+def window_metrics(trader: Trader, window: dict, number: int) -> list:
+    """Per-ticker results of a finished window backtest, measured over the test part only."""
+    return [
+        {'window': number, 'test_start': window['test_start'].date(), 'test_end': window['test_end'].date(), **row}
+        for row in portfolio_metrics(trader)
+    ]
+
+def run_window(config: dict, window: dict, number: int, data_manager: DataManager = None) -> list:
+    """
+    Backtests one window. The training part is loaded as history for the memory layers and
+    indicators; decisions and trades are only made in the test part.
+
+    :param data_manager: A DataManager holding all the data; the window is sliced from it
+                         instead of loading the data again.
+    """
+    print(f"\n=== Walk-forward window {number}: test {window['test_start'].date()} to {window['test_end'].date()} ===")
+    period = (window['train_start'], window['test_end'])
+    trader = Trader(
+        backtest_mode='all', config=config, period=period, trade_start=window['test_start'],
+        data_manager=None if data_manager is None else data_manager.window(*period)
+    )
+    trader.run_backtest(workers=1)
+    return window_metrics(trader, window, number)
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """Aggregates the per-window results per ticker."""
+    results = results.assign(excess_return=results['return'] - results['buy_and_hold_return'])
+    return results.groupby('ticker').agg(
+        windows=('window', 'count'),
+        mean_return=('return', 'mean'),
+        median_return=('return', 'median'),
+        mean_buy_and_hold_return=('buy_and_hold_return', 'mean'),
+        mean_excess_return=('excess_return', 'mean'),
+        beat_buy_and_hold=('excess_return', lambda excess: (excess > 0).mean()),
+        worst_drawdown=('max_drawdown', 'min'),
+        mean_sharpe=('sharpe', 'mean')
+    )
+
+def run_walk_forward(config: dict, workers: int = None, results_dir: str = 'documentation/results'):
+    """
+    Runs every window from the `walk_forward` config section, in parallel across `workers`
+    processes, and writes the per-window results and the aggregated report to `results_dir`.
+    """
+    wf_config = config['walk_forward']
+    windows = generate_windows(
+        wf_config['start'], wf_config['end'], wf_config['train_months'], wf_config['test_months'],
+        wf_config.get('step_months'), wf_config.get('mode', 'rolling')
+    )
+    workers = min(workers or wf_config.get('workers', 1), len(windows))
+    print(f"Running {len(windows)} {wf_config.get('mode', 'rolling')} walk-forward window(s) across {workers} worker(s)...")
+
+    rows = []
+    if workers > 1:
+        worker_config = split_rate_limit(config, workers)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [executor.submit(run_window, worker_config, window, number) for number, window in enumerate(windows, start=1)]
+            for future in futures:
+                rows.extend(future.result())
+    else:
+        data_manager = DataManager(config, backtest_mode='all')
+        for number, window in enumerate(windows, start=1):
+            rows.extend(run_window(config, window, number, data_manager))
+
+    results = pd.DataFrame(rows)
+    if results.empty:
+        print("No walk-forward window produced any trades.")
+        return results, pd.DataFrame()
+    summary = summarize(results)
+
+    os.makedirs(results_dir, exist_ok=True)
+    results.to_csv(os.path.join(results_dir, 'walk_forward_windows.csv'), index=False)
+    report_path = os.path.join(results_dir, 'walk_forward_report.md')
+    with open(report_path, 'w') as f:
+        f.write("# Walk-Forward Report\n\n")
+        f.write(f"{len(windows)} {wf_config.get('mode', 'rolling')} windows: {wf_config['train_months']} months of history, "
+                f"{wf_config['test_months']} months traded.\n\n")
+        f.write("```\n" + summary.to_string(float_format=lambda value: f"{value:.4f}") + "\n```\n")
+    print("\nWalk-forward summary:")
+    print(summary.to_string(float_format=lambda value: f"{value:.4f}"))
+    print(f"\nWalk-forward report saved to {report_path}")
+    return results, summary
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run walk-forward validation over the windows in the walk_forward config section.")
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--workers', type=int, default=None, help="Windows run in parallel. Defaults to walk_forward.workers.")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    run_walk_forward(config, args.workers)